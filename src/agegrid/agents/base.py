@@ -5,6 +5,9 @@ from src.agegrid.env.agegrid_env import AgeGridEnv
 
 
 class Agent(Protocol):
-    def act(self, env: AgeGridEnv) -> tuple | None:
-        """Return an action tuple (e.g. ('gather', id)) or None to stop early."""
+    def act(self, env: AgeGridEnv) -> tuple | int | None:
+        """
+        Return an action tuple (e.g. ('gather', id)), an int from
+        actions.encode_action, or None to stop early.
+        """
         
\ No newline at end of file
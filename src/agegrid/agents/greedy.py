@@ -7,14 +7,15 @@ Position = Tuple[int, int]
 
 
 def _nearest_resource_pos(env: AgeGridEnv, pos: Position) -> Position | None:
-    nodes = [r for r in env.resources if r.remaining > 0]
-    if not nodes:
-        return None
-
-    def dist(p: Position) -> int:
-        return abs(p[0] - pos[0]) + abs(p[1] - pos[1])
-
-    return min(nodes, key=lambda r: dist(r.position)).position
+    best: Position | None = None
+    best_dist = 0
+    for r in env.resources:
+        if r.remaining <= 0:
+            continue
+        d = abs(r.position[0] - pos[0]) + abs(r.position[1] - pos[1])
+        if best is None or d < best_dist:
+            best, best_dist = r.position, d
+    return best
 
 
 class GreedyAgent:
@@ -32,6 +33,23 @@ class GreedyAgent:
         self._last_seen_key: tuple[int, int] | None = None  # (turn, current_player)
         self._rr_index: int = 0
 
+        # Scratch list reused across decisions
+        self._workers: list = []
+
+    # Checkpoint support
+    def get_state(self) -> dict:
+        return {
+            "desired_workers": self.desired_workers,
+            "last_seen_key": list(self._last_seen_key) if self._last_seen_key is not None else None,
+            "rr_index": self._rr_index,
+        }
+
+    def set_state(self, state: dict) -> None:
+        self.desired_workers = state["desired_workers"]
+        key = state["last_seen_key"]
+        self._last_seen_key = (key[0], key[1]) if key is not None else None
+        self._rr_index = state["rr_index"]
+
     def act(self, env: AgeGridEnv) -> tuple | None:
         faction = env.factions[env.current_player]
 
@@ -41,7 +59,11 @@ class GreedyAgent:
             self._last_seen_key = key
             self._rr_index = 0
 
-        workers = [u for u in env.units if u.faction == faction and u.unit_type == "worker"]
+        workers = self._workers
+        workers.clear()
+        for u in env.units:
+            if u.faction == faction and u.unit_type == "worker":
+                workers.append(u)
         if not workers:
             return None
 
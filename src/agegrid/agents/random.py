@@ -7,10 +7,25 @@ from src.agegrid.env.agegrid_env import AgeGridEnv
 class RandomAgent:
     def __init__(self, seed: int = 0):
         self.rng = random.Random(seed)
+        # Scratch list reused across decisions
+        self._workers: list = []
+
+    # Checkpoint support
+    def get_state(self) -> list:
+        version, internal, gauss = self.rng.getstate()
+        return [version, list(internal), gauss]
+
+    def set_state(self, state: list) -> None:
+        version, internal, gauss = state
+        self.rng.setstate((version, tuple(internal), gauss))
 
     def act(self, env: AgeGridEnv) -> tuple | None:
         faction = env.factions[env.current_player]
-        workers = [u for u in env.units if u.faction == faction and u.unit_type == "worker"]
+        workers = self._workers
+        workers.clear()
+        for u in env.units:
+            if u.faction == faction and u.unit_type == "worker":
+                workers.append(u)
         if not workers:
             return None
 
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any
+
+_MISSING = object()
+
+
+class TranspositionTable:
+    """
+    Bounded cache keyed by `env.state_hash` for search agents.
+    Least recently used entries are evicted once capacity is reached.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._entries: OrderedDict[int, Any] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, state_hash: int, default: Any = None) -> Any:
+        entry = self._entries.get(state_hash, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(state_hash)
+        self.hits += 1
+        return entry
+
+    def put(self, state_hash: int, value: Any) -> None:
+        self._entries[state_hash] = value
+        self._entries.move_to_end(state_hash)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, state_hash: int) -> bool:
+        return state_hash in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+from enum import IntEnum
+from typing import Tuple
+
+
+class Reason(IntEnum):
+    # Successful actions (consume an action point)
+    GATHER = 0
+    SPAWN_WORKER = 1
+    MOVE = 2
+
+    # Invalid actions (consume an attempt)
+    NO_ATTEMPTS = 3
+    NO_ACTIONS = 4
+    BAD_ACTION = 5
+    BAD_ARGS = 6
+    NOT_YOUR_UNIT = 7
+    GATHER_FAILED = 8
+    SPAWN_FAILED = 9
+    MOVE_BLOCKED = 10
+    UNKNOWN_ACTION = 11
+
+    # Turn markers written by step_faction
+    STOP = 12
+    TURN_END_NO_ATTEMPTS = 13
+
+    # Combat (appended so existing codes stay stable)
+    ATTACK = 14
+    SPAWN_SOLDIER = 15
+    ATTACK_FAILED = 16
+    SPAWN_SOLDIER_FAILED = 17
+
+    # Buildings
+    BUILD_TURRET = 18
+    BUILD_TURRET_FAILED = 19
+
+
+_OK_CODES = (
+    Reason.GATHER, Reason.SPAWN_WORKER, Reason.MOVE, Reason.ATTACK, Reason.SPAWN_SOLDIER, Reason.BUILD_TURRET,
+)
+_MARKER_CODES = (Reason.STOP, Reason.TURN_END_NO_ATTEMPTS)
+
+
+# Reason strings as returned by apply_action
+REASON_NAMES: Tuple[str, ...] = (
+    "gather",
+    "spawn_worker",
+    "move",
+    "no_attempts",
+    "no_actions",
+    "bad_action",
+    "bad_args",
+    "not_your_unit",
+    "gather_failed",
+    "spawn_failed",
+    "move_blocked",
+    "unknown_action",
+    "stop",
+    "turn_end:no_attempts",
+    "attack",
+    "spawn_soldier",
+    "attack_failed",
+    "spawn_soldier_failed",
+    "build_turret",
+    "build_turret_failed",
+)
+
+# Indexed by Reason code: did the action succeed?
+REASON_OK: Tuple[bool, ...] = tuple(code in _OK_CODES for code in range(len(REASON_NAMES)))
+
+
+# Log lines as written by step_faction, prebuilt so logging doesn't format strings per action
+LOG_LINES: Tuple[str, ...] = tuple(
+    name if REASON_OK[code] or code in _MARKER_CODES else f"invalid:{name}"
+    for code, name in enumerate(REASON_NAMES)
+)
+
+
+# Integer action encoding
+#
+# An encoded action is one int packing (kind, unit id, target cell):
+#   bits 0-3   ActionKind
+#   bits 4-19  unit id (0 when unused)
+#   bits 20+   target cell index y * width + x (0 when unused)
+# Replays, action masks and batch envs can all share this format directly.
+
+class ActionKind(IntEnum):
+    GATHER = 0
+    SPAWN_WORKER = 1
+    MOVE_TOWARDS = 2
+    ATTACK = 3
+    SPAWN_SOLDIER = 4
+    BUILD_TURRET = 5
+
+
+KIND_BITS = 4
+UNIT_BITS = 16
+KIND_MASK = (1 << KIND_BITS) - 1
+UNIT_MASK = (1 << UNIT_BITS) - 1
+TARGET_SHIFT = KIND_BITS + UNIT_BITS
+
+# Tuple action names -> kind, and how long each tuple must be
+ACTION_KINDS = {
+    "gather": ActionKind.GATHER,
+    "spawn_worker": ActionKind.SPAWN_WORKER,
+    "move_towards": ActionKind.MOVE_TOWARDS,
+    "attack": ActionKind.ATTACK,
+    "spawn_soldier": ActionKind.SPAWN_SOLDIER,
+    "build_turret": ActionKind.BUILD_TURRET,
+}
+ACTION_ARITY: Tuple[int, ...] = (2, 1, 3, 2, 1, 1)
+
+
+def pack(kind: int, unit_id: int = 0, cell: int = 0) -> int:
+    return kind | (unit_id << KIND_BITS) | (cell << TARGET_SHIFT)
+
+
+def unpack(code: int) -> Tuple[int, int, int]:
+    """Returns (kind, unit_id, cell)."""
+    return code & KIND_MASK, (code >> KIND_BITS) & UNIT_MASK, code >> TARGET_SHIFT
+
+
+def encode_action(action: tuple, width: int, height: int) -> int:
+    """
+    Encode an action tuple such as ('move_towards', 3, (4, 5)) for a width x height map.
+    Raises ValueError for anything the env would reject as malformed, including off-map targets.
+    """
+    kind = ACTION_KINDS.get(action[0]) if len(action) > 0 and isinstance(action[0], str) else None
+    if kind is None or len(action) != ACTION_ARITY[kind]:
+        raise ValueError(f"Cannot encode action {action!r}")
+
+    if kind == ActionKind.SPAWN_WORKER or kind == ActionKind.SPAWN_SOLDIER or kind == ActionKind.BUILD_TURRET:
+        return pack(kind)
+
+    unit_id = action[1]
+    if not 0 <= unit_id <= UNIT_MASK:
+        raise ValueError(f"Unit id {unit_id} does not fit in {UNIT_BITS} bits")
+
+    if kind == ActionKind.GATHER or kind == ActionKind.ATTACK:
+        return pack(kind, unit_id)
+
+    x, y = action[2]
+    if not (0 <= x < width and 0 <= y < height):
+        raise ValueError(f"Target {action[2]!r} is off the map")
+    return pack(kind, unit_id, y * width + x)
+
+
+def decode_action(code: int, width: int) -> tuple:
+    """Inverse of encode_action."""
+    kind, unit_id, cell = unpack(code)
+    if kind == ActionKind.GATHER:
+        return ("gather", unit_id)
+    if kind == ActionKind.SPAWN_WORKER:
+        return ("spawn_worker",)
+    if kind == ActionKind.MOVE_TOWARDS:
+        return ("move_towards", unit_id, (cell % width, cell // width))
+    if kind == ActionKind.ATTACK:
+        return ("attack", unit_id)
+    if kind == ActionKind.SPAWN_SOLDIER:
+        return ("spawn_soldier",)
+    if kind == ActionKind.BUILD_TURRET:
+        return ("build_turret",)
+    raise ValueError(f"Unknown action kind {kind}")
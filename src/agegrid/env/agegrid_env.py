@@ -1,12 +1,28 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from numbers import Integral
 from typing import Dict, List, Tuple
 import random
 
-from src.agegrid.env.entities import Base, ResourceNode, Unit
-
-from src.agegrid.env.systems import movement, economy, mapgen
+from src.agegrid.env.entities import Base, Building, ResourceNode, Unit
+
+from src.agegrid.env.systems import movement, economy, mapgen, combat, visibility
+from src.agegrid.env import zobrist
+from src.agegrid.env.spatial import SpatialIndex
+from src.agegrid.env.actions import (
+    ACTION_ARITY,
+    ACTION_KINDS,
+    KIND_BITS,
+    KIND_MASK,
+    LOG_LINES,
+    REASON_NAMES,
+    REASON_OK,
+    TARGET_SHIFT,
+    UNIT_MASK,
+    ActionKind,
+    Reason,
+)
 
 Position = Tuple[int, int]
 
@@ -32,8 +48,27 @@ class GameConfig:
     worker_spawn_cost: int = 20
     max_workers: int = 10
 
+    # Combat
+    soldier_spawn_cost: int = 30
+    max_soldiers: int = 10
+    soldier_hp: int = 10
+    soldier_attack_damage: int = 3
+    soldier_attack_range: int = 1
+    # Turrets are built next to the base and fire at the end of their faction's phase
+    turret_cost: int = 40
+    max_turrets: int = 2
+    turret_hp: int = 15
+    turret_attack_damage: int = 2
+    turret_attack_range: int = 2
+    # Cell size of the spatial buckets used for range queries
+    spatial_bucket_size: int = 4
+
+    # Fog of war (Manhattan sight radii)
+    unit_sight_radius: int = 3
+    base_sight_radius: int = 4
+
     # Win Conditions
-    # Eventually add more like money win, combat win etc.
+    # Destroying the enemy base also wins
     target_bank: int = 200 # Temp resource win
 
 
@@ -55,8 +90,26 @@ class AgeGridEnv:
         self.bases: Dict[str, Base] = {}
         self.resources: List[ResourceNode] = []
         self.units: List[Unit] = []
+        self.buildings: List[Building] = []
         self.bank: Dict[str, int] = {}
         self._next_unit_id: int = 1
+        self._next_building_id: int = 1
+
+        # Lookup indexes kept in sync with self.units / self.bases
+        self._unit_index: Dict[int, Unit] = {}
+        # Position of each unit in self.units, for O(1) swap-removal
+        self._unit_slot: Dict[int, int] = {}
+        self._spatial = SpatialIndex(self.config.spatial_bucket_size)
+        # Per-faction fog of war, updated incrementally as units spawn, move and die
+        self._visibility = visibility.Visibility(self.config.width, self.config.height, self.factions)
+        self._occupied: set[Position] = set()
+        # Interned position tuples, indexed y * width + x
+        self._cells: List[Position] = []
+        # Reused by step_faction_codes
+        self._reason_codes: List[int] = []
+
+        # 64-bit Zobrist hash of the game state, kept up to date by every mutation
+        self.state_hash: int = 0
 
         self.reset()
 
@@ -66,6 +119,8 @@ class AgeGridEnv:
         self.turn = 0
         self.current_player = 0
         self._next_unit_id = 1
+        self._next_building_id = 1
+        self.state_hash = 0
 
         self.bases = {
             "Red": Base("Red", self.config.base_hp, (1, 1)),
@@ -81,15 +136,102 @@ class AgeGridEnv:
         )
 
         self.units = []
+        self.buildings = []
+        self._rebuild_indexes()
         self._spawn_worker("Red", (2, 1))
         self._spawn_worker("Blue", (self.config.width - 3, self.config.height - 2))
 
         self.actions_left = self.config.actions_per_turn
         self.attempts_left = self.config.max_attempts_per_turn
 
+        self.state_hash = zobrist.full_hash(self)
+
     def _spawn_worker(self, faction: str, pos: Position) -> None:
-        self.units.append(Unit(self._next_unit_id, faction, "worker", 5, pos))
-        self._next_unit_id += 1
+        self._add_unit(Unit(self._next_unit_id, faction, "worker", 5, pos))
+
+    def _spawn_soldier(self, faction: str, pos: Position) -> None:
+        c = self.config
+        self._add_unit(Unit(
+            self._next_unit_id, faction, "soldier", c.soldier_hp, pos,
+            c.soldier_attack_damage, c.soldier_attack_range,
+        ))
+
+    def _build_turret(self, faction: str, pos: Position) -> None:
+        c = self.config
+        self._add_building(Building(
+            self._next_building_id, faction, "turret", c.turret_hp, pos,
+            c.turret_attack_damage, c.turret_attack_range,
+        ))
+
+    def _add_unit(self, unit: Unit) -> None:
+        self._unit_slot[unit.id] = len(self.units)
+        self.units.append(unit)
+        self._unit_index[unit.id] = unit
+        self._occupied.add(unit.position)
+        self._spatial.add(unit)
+        self._visibility.add(unit.faction, unit.position, visibility.unit_sight(self, unit))
+        self.state_hash ^= zobrist.unit_key(unit.id, unit.faction, unit.unit_type, unit.position)
+        self.state_hash ^= zobrist.unit_hp_key(unit.id, unit.hp)
+        self._next_unit_id = max(self._next_unit_id, unit.id + 1)
+
+    def _remove_unit(self, unit: Unit) -> None:
+        """O(1): the last unit is swapped into the removed unit's slot."""
+        slot = self._unit_slot.pop(unit.id)
+        last = self.units.pop()
+        if last is not unit:
+            self.units[slot] = last
+            self._unit_slot[last.id] = slot
+        del self._unit_index[unit.id]
+        self._occupied.discard(unit.position)
+        self._spatial.remove(unit)
+        self._visibility.remove(unit.faction, unit.position, visibility.unit_sight(self, unit))
+        self.state_hash ^= zobrist.unit_key(unit.id, unit.faction, unit.unit_type, unit.position)
+        self.state_hash ^= zobrist.unit_hp_key(unit.id, unit.hp)
+
+    def _add_building(self, building: Building) -> None:
+        self.buildings.append(building)
+        self._occupied.add(building.position)
+        self._visibility.add(building.faction, building.position, visibility.building_sight(self, building))
+        self.state_hash ^= zobrist.building_key(
+            building.id, building.faction, building.building_type, building.hp, building.position
+        )
+        self._next_building_id = max(self._next_building_id, building.id + 1)
+
+    def _remove_building(self, building: Building) -> None:
+        # Only a couple of buildings per faction, so a linear remove is fine
+        self.buildings.remove(building)
+        self._occupied.discard(building.position)
+        self._visibility.remove(building.faction, building.position, visibility.building_sight(self, building))
+        self.state_hash ^= zobrist.building_key(
+            building.id, building.faction, building.building_type, building.hp, building.position
+        )
+
+    def _rebuild_indexes(self) -> None:
+        """Recompute lookup indexes from units/bases, e.g. after restoring a checkpoint."""
+        w, h = self.config.width, self.config.height
+        self._cells = [(x, y) for y in range(h) for x in range(w)]
+        self._unit_index = {u.id: u for u in self.units}
+        self._unit_slot = {u.id: i for i, u in enumerate(self.units)}
+        self._occupied = {b.position for b in self.bases.values()}
+        self._occupied.update(u.position for u in self.units)
+        self._occupied.update(b.position for b in self.buildings)
+        self._spatial = SpatialIndex(self.config.spatial_bucket_size)
+        for u in self.units:
+            self._spatial.add(u)
+        visibility.rebuild(self)
+
+    # State mutators (keep state_hash in sync)
+
+    def _add_bank(self, faction: str, amount: int) -> None:
+        old = self.bank[faction]
+        self.bank[faction] = old + amount
+        self.state_hash ^= zobrist.bank_key(faction, old) ^ zobrist.bank_key(faction, old + amount)
+
+    def _set_counters(self, actions_left: int, attempts_left: int) -> None:
+        self.state_hash ^= zobrist.counters_key(self.actions_left, self.attempts_left)
+        self.actions_left = actions_left
+        self.attempts_left = attempts_left
+        self.state_hash ^= zobrist.counters_key(actions_left, attempts_left)
 
     # Game Helpers
 
@@ -97,15 +239,36 @@ class AgeGridEnv:
         x, y = pos
         return 0 <= x < self.config.width and 0 <= y < self.config.height
 
+    def _cell(self, x: int, y: int) -> Position:
+        return self._cells[y * self.config.width + x]
+
     def _mirror(self, pos: Position) -> Position:
         x, y = pos
         return (self.config.width - 1 - x, self.config.height - 1 - y)
     
 
     def _occupied_positions(self) -> set[Position]:
-        occ = {b.position for b in self.bases.values()}
-        occ.update(u.position for u in self.units)
-        return occ
+        return set(self._occupied)
+
+    def _is_occupied(self, pos: Position) -> bool:
+        return pos in self._occupied
+
+    def _get_unit(self, unit_id: int) -> Unit | None:
+        return self._unit_index.get(unit_id)
+
+    def _count_units(self, faction: str, unit_type: str) -> int:
+        n = 0
+        for u in self.units:
+            if u.faction == faction and u.unit_type == unit_type:
+                n += 1
+        return n
+
+    def _count_buildings(self, faction: str, building_type: str) -> int:
+        n = 0
+        for b in self.buildings:
+            if b.faction == faction and b.building_type == building_type:
+                n += 1
+        return n
 
     def _resource_at(self, pos: Position) -> ResourceNode | None:
         for r in self.resources:
@@ -131,116 +294,201 @@ class AgeGridEnv:
     def gather(self, worker_id: int) -> bool:
         return economy.gather(self, worker_id)
 
+    def attack(self, unit_id: int) -> bool:
+        return combat.attack(self, unit_id)
+
     def resource_at(self, pos: Position) -> ResourceNode | None:
         return self._resource_at(pos)
 
+    def observe(self, faction: str | None = None) -> visibility.Observation:
+        """What `faction` (default: the current player) can see through the fog of war."""
+        return visibility.observe(self, faction or self._current_faction())
+
 
     # Game turn + display
 
     def start_faction_turn(self) -> None:
         """Reset counters for the currently active faction."""
-        self.actions_left = self.config.actions_per_turn
-        self.attempts_left = self.config.max_attempts_per_turn
+        self._set_counters(self.config.actions_per_turn, self.config.max_attempts_per_turn)
 
     def _current_faction(self) -> str:
         return self.factions[self.current_player]
 
-    def apply_action(self, action: tuple) -> tuple[bool, str]:
+    def apply_action(self, action: tuple | int) -> tuple[bool, str]:
         """
         Apply one action for the current faction.
         Valid action -> consumes 1 action point.
         Invalid action -> consumes 1 attempt (but not an action point).
+        The action may be a tuple or an int from actions.encode_action.
         Returns (success, reason).
         """
+        code = self._apply(action)
+        return REASON_OK[code], REASON_NAMES[code]
+
+    def apply_encoded(self, code: int) -> Reason:
+        """Fast path for integer-encoded actions: no tuple parsing or string compares."""
         if self.attempts_left <= 0:
-            return False, "no_attempts"
+            return Reason.NO_ATTEMPTS
         if self.actions_left <= 0:
-            return False, "no_actions"
+            return Reason.NO_ACTIONS
 
         # every proposal costs an attempt
-        self.attempts_left -= 1
+        self._set_counters(self.actions_left, self.attempts_left - 1)
 
-        faction = self._current_faction()
+        if code < 0:
+            return Reason.BAD_ACTION
+
+        kind = code & KIND_MASK
+        unit_id = (code >> KIND_BITS) & UNIT_MASK
+        cell = code >> TARGET_SHIFT
+
+        target = None
+        if kind == ActionKind.MOVE_TOWARDS:
+            if not 0 <= cell < len(self._cells):
+                return Reason.BAD_ARGS
+            target = self._cells[cell]
+
+        return self._dispatch(kind, unit_id, target)
+
+    def _apply(self, action: tuple | int) -> Reason:
+        """Same as apply_action, but returns a Reason code instead of building a (bool, str) pair."""
+        if type(action) is int:
+            return self.apply_encoded(action)
+        if isinstance(action, Integral) and not isinstance(action, bool):
+            # e.g. NumPy integers from a policy's argmax
+            return self.apply_encoded(int(action))
+
+        if self.attempts_left <= 0:
+            return Reason.NO_ATTEMPTS
+        if self.actions_left <= 0:
+            return Reason.NO_ACTIONS
+
+        # every proposal costs an attempt
+        self._set_counters(self.actions_left, self.attempts_left - 1)
 
         if not isinstance(action, tuple) or len(action) == 0:
-            return False, "bad_action"
+            return Reason.BAD_ACTION
+
+        name = action[0]
+        kind = ACTION_KINDS.get(name) if isinstance(name, str) else None
+        if kind is None:
+            return Reason.UNKNOWN_ACTION
+        if len(action) != ACTION_ARITY[kind]:
+            return Reason.BAD_ARGS
+
+        if kind == ActionKind.SPAWN_WORKER or kind == ActionKind.SPAWN_SOLDIER or kind == ActionKind.BUILD_TURRET:
+            return self._dispatch(kind, 0, None)
+        if kind == ActionKind.GATHER or kind == ActionKind.ATTACK:
+            return self._dispatch(kind, action[1], None)
+        # Same rule as the encoded form: the target must be a cell on the map
+        target = action[2]
+        if not isinstance(target, tuple) or len(target) != 2 or not self._in_bounds(target):
+            return Reason.BAD_ARGS
+        return self._dispatch(kind, action[1], target)
+
+    def _dispatch(self, kind: int, unit_id: int, target: Position | None) -> Reason:
+        faction = self._current_faction()
 
-        kind = action[0]
+        if kind == ActionKind.GATHER:
+            unit = self._get_unit(unit_id)
+            if unit is None or unit.faction != faction:
+                return Reason.NOT_YOUR_UNIT
 
-        if kind == "gather":
-            if len(action) != 2:
-                return False, "bad_args"
-            unit_id = action[1]
-            unit = next((u for u in self.units if u.id == unit_id), None)
+            if self.gather(unit.id):
+                self._set_counters(self.actions_left - 1, self.attempts_left)
+                return Reason.GATHER
+            return Reason.GATHER_FAILED
+
+        if kind == ActionKind.SPAWN_WORKER:
+            if economy.spawn_worker(self, faction):
+                self._set_counters(self.actions_left - 1, self.attempts_left)
+                return Reason.SPAWN_WORKER
+            return Reason.SPAWN_FAILED
+
+        if kind == ActionKind.MOVE_TOWARDS:
+            unit = self._get_unit(unit_id)
             if unit is None or unit.faction != faction:
-                return False, "not_your_unit"
-
-            ok = self.gather(unit_id)
-            if ok:
-                self.actions_left -= 1
-                return True, "gather"
-            return False, "gather_failed"
-        
-        if kind == "spawn_worker":
-            if len(action) !=1:
-                return False, "bad_args"
-            
-            ok = economy.spawn_worker(self, faction)
-            if ok:
-                self.actions_left -=1
-                return True, "spawn_worker"
-            return False, "spawn_failed"
-
-        if kind == "move_towards":
-            if len(action) != 3:
-                return False, "bad_args"
-            unit_id = action[1]
-            target = action[2]
-            unit = next((u for u in self.units if u.id == unit_id), None)
+                return Reason.NOT_YOUR_UNIT
+
+            if self.move_towards(unit.id, target):
+                self._set_counters(self.actions_left - 1, self.attempts_left)
+                return Reason.MOVE
+            return Reason.MOVE_BLOCKED
+
+        if kind == ActionKind.ATTACK:
+            unit = self._get_unit(unit_id)
             if unit is None or unit.faction != faction:
-                return False, "not_your_unit"
+                return Reason.NOT_YOUR_UNIT
 
-            ok = self.move_towards(unit_id, target)
-            if ok:
-                self.actions_left -= 1
-                return True, "move"
-            return False, "move_blocked"
+            if self.attack(unit.id):
+                self._set_counters(self.actions_left - 1, self.attempts_left)
+                return Reason.ATTACK
+            return Reason.ATTACK_FAILED
 
-        return False, "unknown_action"
-    
-        
+        if kind == ActionKind.SPAWN_SOLDIER:
+            if economy.spawn_soldier(self, faction):
+                self._set_counters(self.actions_left - 1, self.attempts_left)
+                return Reason.SPAWN_SOLDIER
+            return Reason.SPAWN_SOLDIER_FAILED
+
+        if kind == ActionKind.BUILD_TURRET:
+            if economy.build_turret(self, faction):
+                self._set_counters(self.actions_left - 1, self.attempts_left)
+                return Reason.BUILD_TURRET
+            return Reason.BUILD_TURRET_FAILED
+
+        return Reason.UNKNOWN_ACTION
 
     def step_faction(self, decide_action) -> list[str]:
         """
         Run the current faction until it spends all actions OR runs out of attempts.
-        decide_action(env) -> action tuple OR None to stop early.
+        decide_action(env) -> action tuple / encoded int OR None to stop early.
         Returns a log of reasons (useful for UI).
         """
+        return [LOG_LINES[code] for code in self.step_faction_codes(decide_action)]
+
+    def step_faction_codes(self, decide_action, on_applied=None) -> list[int]:
+        """
+        Low-allocation version of step_faction for batch runs: returns Reason codes
+        instead of log strings. The returned list is reused and overwritten by the next call.
+        on_applied(code), if given, is called right after each action is applied (e.g. by profilers).
+        """
         self.start_faction_turn()
-        log: list[str] = []
+        codes = self._reason_codes
+        codes.clear()
 
         while self.actions_left > 0 and self.attempts_left > 0:
             action = decide_action(self)
             if action is None:
-                log.append("stop")
+                codes.append(Reason.STOP)
                 break
-
-            ok, reason = self.apply_action(action)
-            log.append(reason if ok else f"invalid:{reason}")
+            code = self._apply(action)
+            codes.append(code)
+            if on_applied is not None:
+                on_applied(code)
 
         if self.attempts_left == 0 and self.actions_left > 0:
-            log.append("turn_end:no_attempts")
-
-        return log
+            codes.append(Reason.TURN_END_NO_ATTEMPTS)
 
+        return codes
 
     def step_end_turn(self) -> None:
+        # Turrets of the faction that just played fire before control passes on
+        combat.turret_fire(self, self._current_faction())
+
+        self.state_hash ^= zobrist.player_key(self.current_player)
         self.current_player = 1 - self.current_player
+        self.state_hash ^= zobrist.player_key(self.current_player)
         if self.current_player == 0:
+            self.state_hash ^= zobrist.turn_key(self.turn) ^ zobrist.turn_key(self.turn + 1)
             self.turn += 1
 
     # Eventually add more win conditions other than resource
     def winner(self) -> str | None:
+        if self.bases["Red"].hp <= 0:
+            return "Blue"
+        if self.bases["Blue"].hp <= 0:
+            return "Red"
         if self.bank["Red"] >= self.config.target_bank:
             return "Red"
         if self.bank["Blue"] >= self.config.target_bank:
@@ -252,6 +500,6 @@ class AgeGridEnv:
             f"Red base @ {self.bases['Red'].position} HP={self.bases['Red'].hp} | Bank={self.bank['Red']}",
             f"Blue base @ {self.bases['Blue'].position} HP={self.bases['Blue'].hp} | Bank={self.bank['Blue']}",
             f"Resources: {len(self.resources)} nodes",
-            "Units: " + ", ".join(f"{u.faction} worker#{u.id} @ {u.position}" for u in self.units),
+            "Units: " + ", ".join(f"{u.faction} {u.unit_type}#{u.id} @ {u.position}" for u in self.units),
         ]
         return "\n".join(lines)
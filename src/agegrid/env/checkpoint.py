@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+import json
+import os
+import zlib
+
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+from src.agegrid.env.entities import Base, Building, ResourceNode, Unit
+from src.agegrid.env import zobrist
+
+# Bump when the layout of env_to_state changes
+VERSION = 4
+_MAGIC = b"AGCK"
+
+
+# Env state <-> plain dict
+
+def env_to_state(env: AgeGridEnv) -> Dict[str, Any]:
+    version, internal, gauss = env.rng.getstate()
+    return {
+        "config": asdict(env.config),
+        "rng": [version, list(internal), gauss],
+        "turn": env.turn,
+        "actions_left": env.actions_left,
+        "attempts_left": env.attempts_left,
+        "current_player": env.current_player,
+        "next_unit_id": env._next_unit_id,
+        "next_building_id": env._next_building_id,
+        "bases": [[b.faction, b.hp, *b.position] for b in env.bases.values()],
+        "resources": [[r.id, *r.position, r.remaining] for r in env.resources],
+        "units": [
+            [u.id, u.faction, u.unit_type, u.hp, *u.position, u.attack_damage, u.attack_range]
+            for u in env.units
+        ],
+        "buildings": [
+            [b.id, b.faction, b.building_type, b.hp, *b.position, b.attack_damage, b.attack_range]
+            for b in env.buildings
+        ],
+        "bank": dict(env.bank),
+        "explored": {f: env._visibility.explored[f].hex() for f in env.factions},
+        "state_hash": env.state_hash,
+    }
+
+
+def env_from_state(state: Dict[str, Any]) -> AgeGridEnv:
+    env = AgeGridEnv(GameConfig(**state["config"]))
+
+    version, internal, gauss = state["rng"]
+    env.rng.setstate((version, tuple(internal), gauss))
+
+    env.turn = state["turn"]
+    env.actions_left = state["actions_left"]
+    env.attempts_left = state["attempts_left"]
+    env.current_player = state["current_player"]
+    env._next_unit_id = state["next_unit_id"]
+    env._next_building_id = state["next_building_id"]
+
+    env.bases = {f: Base(f, hp, (x, y)) for f, hp, x, y in state["bases"]}
+    env.resources = [ResourceNode(rid, (x, y), remaining) for rid, x, y, remaining in state["resources"]]
+    env.units = [
+        Unit(uid, faction, unit_type, hp, (x, y), damage, attack_range)
+        for uid, faction, unit_type, hp, x, y, damage, attack_range in state["units"]
+    ]
+    env.buildings = [
+        Building(bid, faction, building_type, hp, (x, y), damage, attack_range)
+        for bid, faction, building_type, hp, x, y, damage, attack_range in state["buildings"]
+    ]
+    env.bank = dict(state["bank"])
+    env._rebuild_indexes()
+    for f, explored in state["explored"].items():
+        env._visibility.explored[f][:] = bytes.fromhex(explored)
+
+    env.state_hash = zobrist.full_hash(env)
+    if env.state_hash != state["state_hash"]:
+        raise ValueError("Checkpoint state hash mismatch (corrupt or incompatible checkpoint)")
+    return env
+
+
+# Agents can opt in by providing get_state() -> JSON-able and set_state(state)
+
+def agent_state(agent) -> Any:
+    get_state = getattr(agent, "get_state", None)
+    return get_state() if get_state is not None else None
+
+
+def restore_agent(agent, state: Any) -> None:
+    if state is not None and hasattr(agent, "set_state"):
+        agent.set_state(state)
+
+
+# Bytes / files
+
+def dumps(env: AgeGridEnv, agents: Sequence[Any] = (), extra: Dict[str, Any] | None = None) -> bytes:
+    payload = {
+        "env": env_to_state(env),
+        "agents": [agent_state(a) for a in agents],
+        "extra": extra or {},
+    }
+    body = zlib.compress(json.dumps(payload, separators=(",", ":")).encode(), 6)
+    return _MAGIC + VERSION.to_bytes(2, "little") + body
+
+
+def loads(data: bytes) -> Tuple[AgeGridEnv, List[Any], Dict[str, Any]]:
+    """Returns (env, agent_states, extra)."""
+    if data[:4] != _MAGIC:
+        raise ValueError("Not an AgeGrid checkpoint")
+    version = int.from_bytes(data[4:6], "little")
+    if version != VERSION:
+        raise ValueError(f"Unsupported checkpoint version {version} (expected {VERSION})")
+
+    payload = json.loads(zlib.decompress(data[6:]))
+    return env_from_state(payload["env"]), payload["agents"], payload["extra"]
+
+
+def save(path: str | Path, env: AgeGridEnv, agents: Sequence[Any] = (), extra: Dict[str, Any] | None = None) -> None:
+    """Atomic write: a crash mid-save leaves the previous checkpoint intact."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(dumps(env, agents, extra))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load(path: str | Path) -> Tuple[AgeGridEnv, List[Any], Dict[str, Any]]:
+    return loads(Path(path).read_bytes())
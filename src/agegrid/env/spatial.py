@@ -0,0 +1,61 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple
+
+from src.agegrid.env.entities import Unit
+
+Position = Tuple[int, int]
+
+
+class SpatialIndex:
+    """
+    Units bucketed into bucket_size x bucket_size squares of the grid, so range
+    queries only look at nearby buckets instead of every unit on the map.
+    """
+
+    def __init__(self, bucket_size: int = 4):
+        self.bucket_size = bucket_size
+        self._buckets: Dict[Position, Dict[int, Unit]] = {}
+
+    def _bucket(self, pos: Position) -> Position:
+        return (pos[0] // self.bucket_size, pos[1] // self.bucket_size)
+
+    def add(self, unit: Unit) -> None:
+        key = self._bucket(unit.position)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = {}
+        bucket[unit.id] = unit
+
+    def remove(self, unit: Unit) -> None:
+        key = self._bucket(unit.position)
+        bucket = self._buckets[key]
+        del bucket[unit.id]
+        if not bucket:
+            del self._buckets[key]
+
+    def move(self, unit: Unit, old_pos: Position, new_pos: Position) -> None:
+        """Call after unit.position has been set to new_pos."""
+        old_key = self._bucket(old_pos)
+        new_key = self._bucket(new_pos)
+        if old_key == new_key:
+            return
+        bucket = self._buckets[old_key]
+        del bucket[unit.id]
+        if not bucket:
+            del self._buckets[old_key]
+        self.add(unit)
+
+    def within(self, pos: Position, radius: int) -> List[Unit]:
+        """Units within Manhattan distance `radius` of pos."""
+        x, y = pos
+        size = self.bucket_size
+        found: List[Unit] = []
+        for bx in range((x - radius) // size, (x + radius) // size + 1):
+            for by in range((y - radius) // size, (y + radius) // size + 1):
+                bucket = self._buckets.get((bx, by))
+                if bucket is None:
+                    continue
+                for u in bucket.values():
+                    if abs(u.position[0] - x) + abs(u.position[1] - y) <= radius:
+                        found.append(u)
+        return found
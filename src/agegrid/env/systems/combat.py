@@ -0,0 +1,111 @@
+from __future__ import annotations
+from typing import Tuple
+
+from src.agegrid.env import zobrist
+from src.agegrid.env.systems import visibility
+from src.agegrid.env.entities import Base, Building, Unit
+
+Position = Tuple[int, int]
+
+
+def _dist(a: Position, b: Position) -> int:
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+# Targeting: nearest enemy in range, ties broken by lowest hp then id so the
+# result doesn't depend on bucket iteration order
+def nearest_enemy(env, pos: Position, faction: str, attack_range: int) -> Unit | None:
+    best: Unit | None = None
+    best_key = None
+    for u in env._spatial.within(pos, attack_range):
+        if u.faction == faction:
+            continue
+        k = (_dist(u.position, pos), u.hp, u.id)
+        if best_key is None or k < best_key:
+            best, best_key = u, k
+    return best
+
+
+# Buildings aren't in the spatial index; there are only a few per faction
+def nearest_enemy_building(env, pos: Position, faction: str, attack_range: int) -> Building | None:
+    best: Building | None = None
+    best_key = None
+    for b in env.buildings:
+        if b.faction == faction:
+            continue
+        d = _dist(b.position, pos)
+        if d > attack_range:
+            continue
+        k = (d, b.hp, b.id)
+        if best_key is None or k < best_key:
+            best, best_key = b, k
+    return best
+
+
+def damage_unit(env, unit: Unit, amount: int) -> None:
+    env.state_hash ^= zobrist.unit_hp_key(unit.id, unit.hp)
+    unit.hp = max(0, unit.hp - amount)
+    env.state_hash ^= zobrist.unit_hp_key(unit.id, unit.hp)
+    if unit.hp == 0:
+        env._remove_unit(unit)
+
+
+def damage_building(env, building: Building, amount: int) -> None:
+    env.state_hash ^= zobrist.building_key(
+        building.id, building.faction, building.building_type, building.hp, building.position
+    )
+    building.hp = max(0, building.hp - amount)
+    env.state_hash ^= zobrist.building_key(
+        building.id, building.faction, building.building_type, building.hp, building.position
+    )
+    if building.hp == 0:
+        env._remove_building(building)
+
+
+def damage_base(env, base: Base, amount: int) -> None:
+    was_standing = base.hp > 0
+    env.state_hash ^= zobrist.base_hp_key(base.faction, base.hp)
+    base.hp = max(0, base.hp - amount)
+    env.state_hash ^= zobrist.base_hp_key(base.faction, base.hp)
+    if was_standing and base.hp == 0:
+        env._visibility.remove(base.faction, base.position, visibility.base_sight(env, base))
+
+
+# Unit attack: hit the nearest enemy unit in range, then the nearest enemy building,
+# otherwise the enemy base if it's in range
+
+def attack(env, unit_id: int) -> bool:
+    unit = env._get_unit(unit_id)
+    if unit is None or unit.attack_damage <= 0:
+        return False
+
+    target = nearest_enemy(env, unit.position, unit.faction, unit.attack_range)
+    if target is not None:
+        damage_unit(env, target, unit.attack_damage)
+        return True
+
+    building = nearest_enemy_building(env, unit.position, unit.faction, unit.attack_range)
+    if building is not None:
+        damage_building(env, building, unit.attack_damage)
+        return True
+
+    for faction, base in env.bases.items():
+        if faction != unit.faction and base.hp > 0 and _dist(base.position, unit.position) <= unit.attack_range:
+            damage_base(env, base, unit.attack_damage)
+            return True
+
+    return False
+
+
+# Turrets fire automatically at the end of their faction's phase
+
+def turret_fire(env, faction: str) -> int:
+    shots = 0
+    for b in env.buildings:
+        if b.faction != faction or b.building_type != "turret" or b.hp <= 0:
+            continue
+        target = nearest_enemy(env, b.position, faction, b.attack_range)
+        if target is not None:
+            damage_unit(env, target, b.attack_damage)
+            shots += 1
+    return shots
@@ -1,12 +1,17 @@
 from __future__ import annotations
 from typing import Tuple
 
+from src.agegrid.env import zobrist
+
 Position = Tuple[int, int]
 
+# Spawn spots around the base, in order of preference
+_SPAWN_OFFSETS: tuple[Position, ...] = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
 # Gather Resources
 
 def gather(env, worker_id: int) -> bool:
-    unit = next((u for u in env.units if u.id == worker_id), None)
+    unit = env._get_unit(worker_id)
     if unit is None or unit.unit_type != "worker":
         return False
 
@@ -15,36 +20,47 @@ def gather(env, worker_id: int) -> bool:
         return False
 
     amount = min(env.config.worker_gather_amount, node.remaining)
+    env.state_hash ^= zobrist.resource_key(node.id, node.remaining)
     node.remaining -= amount
-    env.bank[unit.faction] += amount
+    env.state_hash ^= zobrist.resource_key(node.id, node.remaining)
+    env._add_bank(unit.faction, amount)
     return True
 
 # Spend resources to recruit or "spawn" a worker
 
 def spawn_worker(env, faction: str) -> bool:
     # Check if workers exceed the max amount
-    workers = [u for u in env.units if u.faction == faction and u.unit_type == "worker"]
-    if len(workers) >= env.config.max_workers:
+    if env._count_units(faction, "worker") >= env.config.max_workers:
+        return False
+    return _recruit(env, faction, env.config.worker_spawn_cost, env._spawn_worker)
+
+
+def spawn_soldier(env, faction: str) -> bool:
+    if env._count_units(faction, "soldier") >= env.config.max_soldiers:
+        return False
+    return _recruit(env, faction, env.config.soldier_spawn_cost, env._spawn_soldier)
+
+
+def build_turret(env, faction: str) -> bool:
+    if env._count_buildings(faction, "turret") >= env.config.max_turrets:
         return False
-    
-    # Check if they can afford to recruit a worker
-    cost = env.config.worker_spawn_cost
+    return _recruit(env, faction, env.config.turret_cost, env._build_turret)
+
+
+def _recruit(env, faction: str, cost: int, spawn) -> bool:
+    # Check if they can afford to recruit
     if env.bank[faction] < cost:
         return False
-    
-    base_pos = env.bases[faction].position
-    candidates: list[Position] = [
-        (base_pos[0] + 1, base_pos[1]),
-        (base_pos[0] -1, base_pos[1]),
-        (base_pos[0], base_pos[1] + 1),
-        (base_pos[0], base_pos[1] - 1)
-    ]
-
-    occ = env._occupied_positions()
-    for pos in candidates:
-        if env._in_bounds(pos) and pos not in occ:
-            env.bank[faction] -= cost
-            env._spawn_worker(faction, pos)
+
+    bx, by = env.bases[faction].position
+    for dx, dy in _SPAWN_OFFSETS:
+        x, y = bx + dx, by + dy
+        if not (0 <= x < env.config.width and 0 <= y < env.config.height):
+            continue
+        pos = env._cell(x, y)
+        if not env._is_occupied(pos):
+            env._add_bank(faction, -cost)
+            spawn(faction, pos)
             return True
-        
-    return False
\ No newline at end of file
+
+    return False
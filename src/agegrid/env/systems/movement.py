@@ -1,6 +1,9 @@
 from __future__ import annotations
 from typing import Tuple
 
+from src.agegrid.env import zobrist
+from src.agegrid.env.systems import visibility
+
 Position = Tuple[int,int]
 
 
@@ -14,7 +17,7 @@ _DELTAS: dict[str, Position] = {
 
 # Moves the unit, verifies its a legal move
 def move_unit(env, unit_id: int, direction: str) -> bool:
-    unit = next((u for u in env.units if u.id == unit_id), None)
+    unit = env._get_unit(unit_id)
     
     # Check if unit exists
     if unit is None:
@@ -25,18 +28,27 @@ def move_unit(env, unit_id: int, direction: str) -> bool:
         return False
     
     dx, dy = _DELTAS[direction]
-    new_pos = (unit.position[0] + dx, unit.position[1] + dy)
+    nx = unit.position[0] + dx
+    ny = unit.position[1] + dy
 
     # More validation checks
-    if not env._in_bounds(new_pos):
+    if not (0 <= nx < env.config.width and 0 <= ny < env.config.height):
         return False
-    if new_pos in env._occupied_positions():
+    new_pos = env._cell(nx, ny)
+    if env._is_occupied(new_pos):
         return False
+    old_pos = unit.position
+    env._occupied.discard(old_pos)
+    env._occupied.add(new_pos)
+    env.state_hash ^= zobrist.unit_key(unit.id, unit.faction, unit.unit_type, old_pos)
     unit.position = new_pos
+    env.state_hash ^= zobrist.unit_key(unit.id, unit.faction, unit.unit_type, new_pos)
+    env._spatial.move(unit, old_pos, new_pos)
+    env._visibility.move(unit.faction, old_pos, new_pos, visibility.unit_sight(env, unit))
     return True
 
 def move_towards(env, unit_id: int, target: Position) -> bool:
-    unit=next((u for u in env.units if u.id == unit_id), None)
+    unit = env._get_unit(unit_id)
 
     if unit is None:
         return False
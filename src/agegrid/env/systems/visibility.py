@@ -0,0 +1,161 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from src.agegrid.env.entities import Base, Building, ResourceNode, Unit
+
+Position = Tuple[int, int]
+
+
+def _diamond(radius: int) -> List[Position]:
+    return [
+        (dx, dy)
+        for dy in range(-radius, radius + 1)
+        for dx in range(-radius + abs(dy), radius - abs(dy) + 1)
+    ]
+
+
+class Visibility:
+    """
+    Per-faction fog of war.
+    visible[f][i] counts how many of f's observers see cell i (y * width + x);
+    mask[f][i] is 1 while that count is non-zero;
+    explored[f][i] is 1 once f has ever seen cell i.
+    Moves only touch the cells entering and leaving the observer's sight radius.
+    """
+
+    def __init__(self, width: int, height: int, factions: Tuple[str, ...]):
+        self.width = width
+        self.height = height
+        self.visible: Dict[str, List[int]] = {f: [0] * (width * height) for f in factions}
+        self.mask: Dict[str, bytearray] = {f: bytearray(width * height) for f in factions}
+        self.explored: Dict[str, bytearray] = {f: bytearray(width * height) for f in factions}
+
+        self._diamonds: Dict[int, List[Position]] = {}
+        # (radius, dx, dy) -> (offsets entering, offsets leaving) relative to the new / old position
+        self._edges: Dict[Tuple[int, int, int], Tuple[List[Position], List[Position]]] = {}
+
+    def _offsets(self, radius: int) -> List[Position]:
+        offsets = self._diamonds.get(radius)
+        if offsets is None:
+            offsets = self._diamonds[radius] = _diamond(radius)
+        return offsets
+
+    def _edge(self, radius: int, dx: int, dy: int) -> Tuple[List[Position], List[Position]]:
+        key = (radius, dx, dy)
+        edge = self._edges.get(key)
+        if edge is None:
+            cells = set(self._offsets(radius))
+            # entering: in the new diamond but not the old one (old centre is at -dx, -dy from new)
+            entering = [(ox, oy) for ox, oy in cells if (ox + dx, oy + dy) not in cells]
+            # leaving: in the old diamond but not the new one (new centre is at +dx, +dy from old)
+            leaving = [(ox, oy) for ox, oy in cells if (ox - dx, oy - dy) not in cells]
+            edge = self._edges[key] = (entering, leaving)
+        return edge
+
+    def _stamp(self, faction: str, pos: Position, offsets: List[Position], delta: int) -> None:
+        visible = self.visible[faction]
+        mask = self.mask[faction]
+        explored = self.explored[faction]
+        w, h = self.width, self.height
+        x, y = pos
+        if delta > 0:
+            for ox, oy in offsets:
+                cx, cy = x + ox, y + oy
+                if 0 <= cx < w and 0 <= cy < h:
+                    i = cy * w + cx
+                    if visible[i] == 0:
+                        mask[i] = 1
+                        explored[i] = 1
+                    visible[i] += 1
+        else:
+            for ox, oy in offsets:
+                cx, cy = x + ox, y + oy
+                if 0 <= cx < w and 0 <= cy < h:
+                    i = cy * w + cx
+                    visible[i] -= 1
+                    if visible[i] == 0:
+                        mask[i] = 0
+
+    def add(self, faction: str, pos: Position, radius: int) -> None:
+        self._stamp(faction, pos, self._offsets(radius), 1)
+
+    def remove(self, faction: str, pos: Position, radius: int) -> None:
+        self._stamp(faction, pos, self._offsets(radius), -1)
+
+    def move(self, faction: str, old_pos: Position, new_pos: Position, radius: int) -> None:
+        entering, leaving = self._edge(radius, new_pos[0] - old_pos[0], new_pos[1] - old_pos[1])
+        self._stamp(faction, old_pos, leaving, -1)
+        self._stamp(faction, new_pos, entering, 1)
+
+    def is_visible(self, faction: str, pos: Position) -> bool:
+        return self.mask[faction][pos[1] * self.width + pos[0]] == 1
+
+    def is_explored(self, faction: str, pos: Position) -> bool:
+        return self.explored[faction][pos[1] * self.width + pos[0]] == 1
+
+
+# Sight radii
+
+def unit_sight(env, unit: Unit) -> int:
+    return env.config.unit_sight_radius
+
+
+def base_sight(env, base: Base) -> int:
+    return env.config.base_sight_radius
+
+
+def building_sight(env, building: Building) -> int:
+    return env.config.base_sight_radius
+
+
+def rebuild(env) -> None:
+    """Recompute visibility from scratch. Explored cells only reflect what is seen right now."""
+    vis = Visibility(env.config.width, env.config.height, env.factions)
+    for b in env.bases.values():
+        if b.hp > 0:  # a destroyed base no longer sees anything
+            vis.add(b.faction, b.position, base_sight(env, b))
+    for b in env.buildings:
+        vis.add(b.faction, b.position, building_sight(env, b))
+    for u in env.units:
+        vis.add(u.faction, u.position, unit_sight(env, u))
+    env._visibility = vis
+
+
+# Filtered observation
+
+@dataclass
+class Observation:
+    faction: str
+    turn: int
+    current_player: int
+    actions_left: int
+    attempts_left: int
+    bank: int
+    units: List[Unit]  # own units
+    enemy_units: List[Unit]  # currently visible enemy units
+    bases: List[Base]  # own base plus the enemy base if visible
+    buildings: List[Building]  # own buildings plus visible enemy ones
+    resources: List[ResourceNode]  # nodes in currently visible cells
+    visible: bytes  # 1 where currently visible, row-major (y * width + x)
+    explored: bytes  # 1 where ever seen
+
+
+def observe(env, faction: str) -> Observation:
+    vis = env._visibility
+    seen = vis.is_visible
+    return Observation(
+        faction=faction,
+        turn=env.turn,
+        current_player=env.current_player,
+        actions_left=env.actions_left,
+        attempts_left=env.attempts_left,
+        bank=env.bank[faction],
+        units=[u for u in env.units if u.faction == faction],
+        enemy_units=[u for u in env.units if u.faction != faction and seen(faction, u.position)],
+        bases=[b for b in env.bases.values() if b.faction == faction or seen(faction, b.position)],
+        buildings=[b for b in env.buildings if b.faction == faction or seen(faction, b.position)],
+        resources=[r for r in env.resources if seen(faction, r.position)],
+        visible=bytes(vis.mask[faction]),
+        explored=bytes(vis.explored[faction]),
+    )
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from typing import List, Tuple
+
+Position = Tuple[int, int]
+
+# Resource nodes are hashed by how many gathers they have left rather than the
+# exact amount, so nodes that only differ by a partial gather share a key.
+RESOURCE_BUCKET = 5
+
+_MASK = (1 << 64) - 1
+
+# Small integer codes for the string-valued feature fields
+_FACTIONS = {"Red": 0, "Blue": 1}
+_UNIT_TYPES = {"worker": 0, "soldier": 1}
+_BUILDING_TYPES = {"turret": 0}
+
+# Feature tags, packed into the low 4 bits of the first word
+_UNIT, _UNIT_HP, _BASE_HP, _BUILDING, _RES, _BANK, _PLAYER, _TURN, _COUNTERS = range(1, 10)
+
+
+# Zobrist keys are derived from the feature itself (not drawn from an RNG in
+# order), so they are identical across processes, runs and feature orderings.
+# Each feature is packed into 64-bit words and run through splitmix64, so a key
+# costs a few integer ops and nothing is cached.
+def mix(x: int) -> int:
+    """splitmix64 finaliser."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+
+# Feature keys
+
+def unit_key(unit_id: int, faction: str, unit_type: str, pos: Position) -> int:
+    head = _UNIT | _FACTIONS[faction] << 4 | _UNIT_TYPES[unit_type] << 6 | pos[0] << 8 | pos[1] << 32
+    return mix(mix(head & _MASK) ^ unit_id)
+
+
+def unit_hp_key(unit_id: int, hp: int) -> int:
+    return mix(mix(_UNIT_HP | (unit_id << 4 & _MASK)) ^ hp)
+
+
+def base_hp_key(faction: str, hp: int) -> int:
+    return mix(mix(_BASE_HP | _FACTIONS[faction] << 4) ^ hp)
+
+
+def building_key(building_id: int, faction: str, building_type: str, hp: int, pos: Position) -> int:
+    head = _BUILDING | _FACTIONS[faction] << 4 | _BUILDING_TYPES[building_type] << 6 | pos[0] << 8 | pos[1] << 32
+    return mix(mix(mix(head & _MASK) ^ building_id) ^ hp)
+
+
+def resource_key(resource_id: int, remaining: int) -> int:
+    return mix(mix(_RES | (resource_id << 4 & _MASK)) ^ -(-remaining // RESOURCE_BUCKET))
+
+
+def bank_key(faction: str, amount: int) -> int:
+    return mix(mix(_BANK | _FACTIONS[faction] << 4) ^ (amount & _MASK))
+
+
+def player_key(player: int) -> int:
+    return mix(_PLAYER | player << 4)
+
+
+def turn_key(turn: int) -> int:
+    return mix(_TURN | (turn << 4 & _MASK))
+
+
+def counters_key(actions_left: int, attempts_left: int) -> int:
+    return mix(_COUNTERS | actions_left << 4 | (attempts_left << 34 & _MASK))
+
+
+def full_hash(env) -> int:
+    """Hash the env from scratch. The env keeps `env.state_hash` equal to this incrementally."""
+    h = 0
+    for u in env.units:
+        h ^= unit_key(u.id, u.faction, u.unit_type, u.position)
+        h ^= unit_hp_key(u.id, u.hp)
+    for b in env.buildings:
+        h ^= building_key(b.id, b.faction, b.building_type, b.hp, b.position)
+    for f, base in env.bases.items():
+        h ^= base_hp_key(f, base.hp)
+    for r in env.resources:
+        h ^= resource_key(r.id, r.remaining)
+    for f, amount in env.bank.items():
+        h ^= bank_key(f, amount)
+    h ^= player_key(env.current_player)
+    h ^= turn_key(env.turn)
+    h ^= counters_key(env.actions_left, env.attempts_left)
+    return h
+
+
+def first_divergence(a: List[int], b: List[int]) -> int | None:
+    """Index of the first differing per-turn checksum, or None if one run is a prefix of the other."""
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return i
+    return None
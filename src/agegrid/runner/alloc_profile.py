@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List
+import tracemalloc
+
+from src.agegrid.env.agegrid_env import AgeGridEnv
+from src.agegrid.agents.greedy import GreedyAgent
+from src.agegrid.agents.random import RandomAgent
+from src.agegrid.runner.simulate import EpisodeResult, run_episode
+
+
+@dataclass
+class AllocReport:
+    result: EpisodeResult
+    actions: int
+    peak_bytes: int  # peak traced memory above the pre-episode baseline
+    retained_bytes: int  # traced memory still held once the episode returns
+    max_action_bytes: int  # worst peak growth over a single decide + apply
+    total_action_bytes: int  # sum of the per-action peak growths
+    top_sites: List[str] = field(default_factory=list)  # biggest retained allocation sites
+
+    @property
+    def avg_action_bytes(self) -> float:
+        return self.total_action_bytes / self.actions if self.actions else 0.0
+
+
+class _Meter:
+    """
+    One meter shared by both sides: the window opens when an agent is asked to
+    decide and closes once the env has applied that action, so each sample covers
+    exactly one decide + apply and nothing from the other faction's phase.
+    """
+
+    def __init__(self, baseline: int):
+        self.samples: List[int] = []
+        self.baseline = baseline
+        self.peak = baseline  # highest traced memory seen across all windows
+        self._start = baseline
+
+    def begin(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        tracemalloc.reset_peak()
+        self._start = current
+
+    def end(self, code: int) -> None:
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak = max(self.peak, peak)
+        self.samples.append(peak - self._start)
+
+
+class _Metered:
+    """Wraps an agent so its decisions open a measurement window."""
+
+    def __init__(self, agent, meter: _Meter):
+        self.agent = agent
+        self.meter = meter
+
+    def act(self, env: AgeGridEnv) -> tuple | None:
+        self.meter.begin()
+        return self.agent.act(env)
+
+
+def profile_episode(env: AgeGridEnv, red_agent, blue_agent, top: int = 10) -> AllocReport:
+    """Run one episode under tracemalloc and report its allocation budget."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        meter = _Meter(tracemalloc.get_traced_memory()[0])
+
+        # Windows open when an agent decides and close right after the env applies the action
+        result = run_episode(env, _Metered(red_agent, meter), _Metered(blue_agent, meter), on_applied=meter.end)
+
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    stats = after.compare_to(before, "lineno")
+    sites = [str(s) for s in stats[:top] if s.size_diff > 0]
+    samples = meter.samples
+
+    return AllocReport(
+        result=result,
+        actions=len(samples),
+        peak_bytes=max(0, max(peak, meter.peak) - meter.baseline),
+        retained_bytes=max(0, current - meter.baseline),
+        max_action_bytes=max(samples, default=0),
+        total_action_bytes=sum(samples),
+        top_sites=sites,
+    )
+
+
+def main() -> None:
+    report = profile_episode(AgeGridEnv(), GreedyAgent(desired_workers=2), RandomAgent(seed=0))
+
+    print(f"Winner: {report.result.winner} after {report.result.turns} turns")
+    print(f"Decisions: {report.actions}")
+    print(f"Peak bytes: {report.peak_bytes} | Retained bytes: {report.retained_bytes}")
+    print(f"Max bytes per action: {report.max_action_bytes} | Avg: {report.avg_action_bytes:.0f}")
+    print("Top retained allocation sites:")
+    for line in report.top_sites:
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
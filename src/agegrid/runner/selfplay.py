@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from multiprocessing import Process, shared_memory
+from numbers import Integral
+from typing import Callable, Dict, Iterator, List, Tuple
+import time
+
+import numpy as np
+
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+from src.agegrid.env.actions import encode_action
+from src.agegrid.env.systems.visibility import Observation
+from src.agegrid.agents.greedy import GreedyAgent
+from src.agegrid.agents.random import RandomAgent
+
+
+# Observation planes, each height x width uint8, built from the faction's fog-filtered view
+OBS_CHANNELS = 9
+(
+    CH_OWN_WORKERS,
+    CH_OWN_SOLDIERS,
+    CH_ENEMY_WORKERS,
+    CH_ENEMY_SOLDIERS,
+    CH_OWN_BASE,
+    CH_ENEMY_BASE,
+    CH_RESOURCES,  # remaining amount, capped at 255
+    CH_VISIBLE,
+    CH_EXPLORED,
+) = range(OBS_CHANNELS)
+
+
+def encode_observation(obs: Observation, out: np.ndarray) -> np.ndarray:
+    """Write obs into out (shape (OBS_CHANNELS, height, width), uint8) in place."""
+    out.fill(0)
+    height, width = out.shape[1], out.shape[2]
+
+    for u in obs.units:
+        ch = CH_OWN_SOLDIERS if u.unit_type == "soldier" else CH_OWN_WORKERS
+        out[ch, u.position[1], u.position[0]] = 1
+    for u in obs.enemy_units:
+        ch = CH_ENEMY_SOLDIERS if u.unit_type == "soldier" else CH_ENEMY_WORKERS
+        out[ch, u.position[1], u.position[0]] = 1
+    for b in obs.bases:
+        ch = CH_OWN_BASE if b.faction == obs.faction else CH_ENEMY_BASE
+        out[ch, b.position[1], b.position[0]] = 1
+    for r in obs.resources:
+        out[CH_RESOURCES, r.position[1], r.position[0]] = min(r.remaining, 255)
+
+    out[CH_VISIBLE] = np.frombuffer(obs.visible, dtype=np.uint8).reshape(height, width)
+    out[CH_EXPLORED] = np.frombuffer(obs.explored, dtype=np.uint8).reshape(height, width)
+    return out
+
+
+# Shared-memory ring buffer
+
+# Header: write index, read index and stop flag, each on its own 64-byte line
+_WRITE, _READ, _STOP = 0, 8, 16
+_HEADER_BYTES = 192
+
+
+@dataclass(frozen=True)
+class TrajectorySpec:
+    capacity: int
+    height: int
+    width: int
+    channels: int = OBS_CHANNELS
+
+    def layout(self) -> Tuple[Dict[str, Tuple[int, tuple, np.dtype]], int]:
+        """Field name -> (byte offset, shape, dtype), plus total size in bytes."""
+        fields = [
+            ("obs", (self.capacity, self.channels, self.height, self.width), np.dtype(np.uint8)),
+            ("action", (self.capacity,), np.dtype(np.int64)),
+            ("reward", (self.capacity,), np.dtype(np.float32)),
+            ("done", (self.capacity,), np.dtype(np.uint8)),
+            ("player", (self.capacity,), np.dtype(np.uint8)),  # 0 = Red, 1 = Blue
+        ]
+        layout: Dict[str, Tuple[int, tuple, np.dtype]] = {}
+        offset = _HEADER_BYTES
+        for name, shape, dtype in fields:
+            offset = (offset + 63) // 64 * 64
+            layout[name] = (offset, shape, dtype)
+            offset += int(np.prod(shape)) * dtype.itemsize
+        return layout, offset
+
+
+@dataclass
+class TrajectoryBatch:
+    """
+    Views into the ring (no copy). Only valid until the reader calls release().
+    Both sides of an episode share one ring, so split by `player` before computing returns.
+    """
+    obs: np.ndarray
+    action: np.ndarray
+    reward: np.ndarray
+    done: np.ndarray
+    player: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.action)
+
+
+class TrajectoryRing:
+    """
+    Single-producer / single-consumer ring of (obs, action, reward, done, player) in shared memory.
+    The producer only ever advances the write index and the consumer only the read
+    index, so no lock is needed: a slot's data is written before the write index that
+    publishes it, and read before the read index that frees it.
+    """
+
+    def __init__(self, spec: TrajectorySpec, name: str | None = None):
+        self.spec = spec
+        layout, size = spec.layout()
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+
+        buf = self.shm.buf
+        self._header = np.ndarray((_HEADER_BYTES // 8,), dtype=np.int64, buffer=buf)
+        if self.owner:
+            self._header[:] = 0
+        self.arrays: Dict[str, np.ndarray] = {
+            field: np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            for field, (offset, shape, dtype) in layout.items()
+        }
+        self.obs = self.arrays["obs"]
+        self.action = self.arrays["action"]
+        self.reward = self.arrays["reward"]
+        self.done = self.arrays["done"]
+        self.player = self.arrays["player"]
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # Producer side
+
+    def push(
+        self, obs: np.ndarray, action: int, reward: float, done: bool, player: int, poll: float = 0.0005
+    ) -> bool:
+        """Blocks while the ring is full (backpressure). Returns False if the reader asked to stop."""
+        header = self._header
+        cap = self.spec.capacity
+        w = int(header[_WRITE])
+        while w - int(header[_READ]) >= cap:
+            if header[_STOP]:
+                return False
+            time.sleep(poll)
+        if header[_STOP]:
+            return False
+
+        slot = w % cap
+        self.obs[slot] = obs
+        self.action[slot] = action
+        self.reward[slot] = reward
+        self.done[slot] = done
+        self.player[slot] = player
+        header[_WRITE] = w + 1  # publish
+        return True
+
+    # Consumer side
+
+    def available(self) -> int:
+        return int(self._header[_WRITE]) - int(self._header[_READ])
+
+    def peek(self, max_items: int) -> TrajectoryBatch:
+        """Up to max_items published transitions as zero-copy views (never wraps past the ring end)."""
+        r = int(self._header[_READ])
+        n = min(max_items, int(self._header[_WRITE]) - r)
+        start = r % self.spec.capacity
+        end = min(start + n, self.spec.capacity)
+        return TrajectoryBatch(
+            obs=self.obs[start:end],
+            action=self.action[start:end],
+            reward=self.reward[start:end],
+            done=self.done[start:end],
+            player=self.player[start:end],
+        )
+
+    def release(self, n: int) -> None:
+        """Hand n slots back to the producer once their views are no longer needed."""
+        self._header[_READ] += n
+
+    def stop(self) -> None:
+        self._header[_STOP] = 1
+
+    def close(self) -> None:
+        # Drop the numpy views before closing the mapping
+        self._header = None
+        self.arrays = {}
+        self.obs = self.action = self.reward = self.done = self.player = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# Actors
+
+def default_matchup(actor_id: int, episode: int) -> tuple:
+    return GreedyAgent(desired_workers=2), RandomAgent(seed=actor_id * 1_000_003 + episode)
+
+
+class _Recorder:
+    """
+    Wraps one side's agent and pushes its transitions. Each transition is held
+    back until the faction's next decision (reward 0) or the episode end (terminal
+    reward, done=1), so nothing already published ever needs patching.
+    """
+
+    def __init__(self, agent, ring: TrajectoryRing, spec: TrajectorySpec, player: int):
+        self.agent = agent
+        self.ring = ring
+        self.player = player
+        self._obs = np.zeros((spec.channels, spec.height, spec.width), dtype=np.uint8)
+        self._pending_obs = np.zeros_like(self._obs)
+        self._pending_action: int | None = None
+        self.stopped = False
+
+    def act(self, env: AgeGridEnv) -> int | None:
+        encode_observation(env.observe(), self._obs)
+        action = self.agent.act(env)
+        if action is None:
+            return None
+        if isinstance(action, Integral) and not isinstance(action, bool):
+            code = int(action)
+        else:
+            code = encode_action(action, env.config.width, env.config.height)
+
+        if self._pending_action is not None and not self.ring.push(
+            self._pending_obs, self._pending_action, 0.0, False, self.player
+        ):
+            self.stopped = True
+        self._obs, self._pending_obs = self._pending_obs, self._obs
+        self._pending_action = code
+        return code
+
+    def finish(self, reward: float) -> None:
+        if self._pending_action is not None:
+            if not self.ring.push(self._pending_obs, self._pending_action, reward, True, self.player):
+                self.stopped = True
+            self._pending_action = None
+
+
+def actor_loop(
+    ring_name: str,
+    spec: TrajectorySpec,
+    actor_id: int,
+    episodes: int,
+    config: GameConfig | None = None,
+    matchup: Callable[[int, int], tuple] = default_matchup,
+) -> None:
+    """Self-play episodes (run_episode-style turn loop), both sides recorded into one ring, tagged by player."""
+    ring = TrajectoryRing(spec, name=ring_name)
+    base = config or GameConfig()
+    try:
+        for ep in range(episodes):
+            env = AgeGridEnv(replace(base, seed=base.seed + actor_id * 100_003 + ep))
+            red_agent, blue_agent = matchup(actor_id, ep)
+            sides = (_Recorder(red_agent, ring, spec, 0), _Recorder(blue_agent, ring, spec, 1))
+            acts = (sides[0].act, sides[1].act)
+
+            while env.turn < env.config.max_turns and env.winner() is None:
+                env.step_faction_codes(acts[env.current_player])
+                env.step_end_turn()
+                if sides[0].stopped or sides[1].stopped:
+                    return
+
+            winner = env.winner()
+            if winner is None and env.bank["Red"] != env.bank["Blue"]:
+                winner = "Red" if env.bank["Red"] > env.bank["Blue"] else "Blue"
+            for faction, side in zip(env.factions, sides):
+                side.finish(0.0 if winner is None else (1.0 if winner == faction else -1.0))
+                if side.stopped:
+                    return
+    finally:
+        ring.close()
+
+
+# Learner side
+
+class SelfPlayPipeline:
+    """
+    One SPSC ring per actor process; the learner drains them round-robin.
+    Use as a context manager so shared memory is always unlinked.
+    """
+
+    def __init__(
+        self,
+        num_actors: int = 4,
+        episodes_per_actor: int = 100,
+        capacity: int = 4096,
+        config: GameConfig | None = None,
+        matchup: Callable[[int, int], tuple] = default_matchup,
+    ):
+        self.config = config or GameConfig()
+        self.spec = TrajectorySpec(capacity=capacity, height=self.config.height, width=self.config.width)
+        self.rings: List[TrajectoryRing] = [TrajectoryRing(self.spec) for _ in range(num_actors)]
+        self.actors: List[Process] = [
+            Process(
+                target=actor_loop,
+                args=(ring.name, self.spec, i, episodes_per_actor, self.config, matchup),
+                daemon=True,
+            )
+            for i, ring in enumerate(self.rings)
+        ]
+        self._next = 0
+
+    def __enter__(self) -> "SelfPlayPipeline":
+        for p in self.actors:
+            p.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def check_actors(self) -> None:
+        """Raise if any actor process died with an error rather than finishing its episodes."""
+        for i, p in enumerate(self.actors):
+            if p.exitcode:
+                raise RuntimeError(f"Self-play actor {i} exited with code {p.exitcode}")
+
+    def running(self) -> bool:
+        self.check_actors()
+        return any(p.is_alive() for p in self.actors) or any(r.available() for r in self.rings)
+
+    def batches(self, batch_size: int, poll: float = 0.001) -> Iterator[TrajectoryBatch]:
+        """
+        Yield zero-copy batches until every actor is done and every ring is drained.
+        Raises RuntimeError as soon as an actor is found to have crashed.
+        A batch's views are released back to its actor when the next batch is requested,
+        so copy anything that must outlive one iteration.
+        """
+        while self.running():
+            for _ in range(len(self.rings)):
+                ring = self.rings[self._next]
+                self._next = (self._next + 1) % len(self.rings)
+                batch = ring.peek(batch_size)
+                if len(batch):
+                    yield batch
+                    ring.release(len(batch))
+                    break
+            else:
+                time.sleep(poll)
+
+    def close(self) -> None:
+        for ring in self.rings:
+            ring.stop()
+        for p in self.actors:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        for ring in self.rings:
+            ring.close()
+
+
+def main() -> None:
+    start = time.perf_counter()
+    transitions = episodes = 0
+    reward_sum = 0.0
+
+    with SelfPlayPipeline(num_actors=4, episodes_per_actor=50) as pipeline:
+        for batch in pipeline.batches(256):
+            transitions += len(batch)
+            episodes += int(batch.done.sum())
+            reward_sum += float(batch.reward.sum())
+
+    elapsed = time.perf_counter() - start
+    print(f"Transitions: {transitions} | Terminal transitions: {episodes} | Reward sum: {reward_sum:.0f}")
+    print(f"Throughput: {transitions / elapsed:.0f} transitions/s over {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
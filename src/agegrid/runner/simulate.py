@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import os
+import time
 
 from src.agegrid.env.agegrid_env import AgeGridEnv
+from src.agegrid.env import checkpoint
 from src.agegrid.agents.greedy import GreedyAgent
 from src.agegrid.agents.random import RandomAgent
 
@@ -14,43 +19,81 @@ class EpisodeResult:
     turns: int
     red_bank: int
     blue_bank: int
-    ended_by: str  # "target_bank" or "max_turns"
+    ended_by: str  # "target_bank", "base_destroyed" or "max_turns"
+    # env.state_hash after every faction phase, for cheap divergence checks between runs/replays
+    checksums: List[int] = field(default_factory=list)
 
 
-def run_episode(env: AgeGridEnv, red_agent, blue_agent) -> EpisodeResult:
+class CheckpointClock:
+    """
+    When the last checkpoint was written. run_batch shares one across episodes,
+    so the save cadence isn't restarted by every (short) episode.
+    """
+
+    def __init__(self, every: float = 5.0):
+        self.every = every
+        self.last = time.monotonic()
+
+    def due(self) -> bool:
+        return time.monotonic() - self.last >= self.every
+
+    def saved(self) -> None:
+        self.last = time.monotonic()
+
+
+def _result(env: AgeGridEnv, winner: Optional[str], ended_by: str, checksums: List[int]) -> EpisodeResult:
+    return EpisodeResult(
+        winner=winner,
+        turns=env.turn,
+        red_bank=env.bank["Red"],
+        blue_bank=env.bank["Blue"],
+        ended_by=ended_by,
+        checksums=checksums,
+    )
+
+
+def run_episode(
+    env: AgeGridEnv,
+    red_agent,
+    blue_agent,
+    checkpoint_path: str | Path | None = None,
+    checkpoint_every: float = 5.0,
+    checkpoint_extra: Optional[Dict[str, Any]] = None,
+    checksums: Optional[List[int]] = None,
+    on_applied: Optional[Callable[[int], None]] = None,
+    clock: Optional[CheckpointClock] = None,
+) -> EpisodeResult:
     """
     Runs one episode until:
       - someone reaches env.config.target_bank, OR
       - env.config.max_turns is reached
+
+    With checkpoint_path set, the env, agent states and checkpoint_extra are
+    written atomically at most every checkpoint_every seconds (between faction
+    phases), timed by `clock` when one is shared across episodes.
+    resume_episode picks up from such a file bit-exactly.
+    on_applied is forwarded to env.step_faction_codes.
     """
+    checksums = [] if checksums is None else checksums
+    acts = (red_agent.act, blue_agent.act)
+    clock = clock or CheckpointClock(checkpoint_every)
+
     while env.turn < env.config.max_turns:
-        # --- Red phase ---
-        env.step_faction(lambda e: red_agent.act(e))
+        # Red phase when current_player == 0, Blue phase otherwise
+        env.step_faction_codes(acts[env.current_player], on_applied)
         env.step_end_turn()
+        checksums.append(env.state_hash)
 
         w = env.winner()
         if w is not None:
-            return EpisodeResult(
-                winner=w,
-                turns=env.turn,
-                red_bank=env.bank["Red"],
-                blue_bank=env.bank["Blue"],
-                ended_by="target_bank",
-            )
-
-        # --- Blue phase ---
-        env.step_faction(lambda e: blue_agent.act(e))
-        env.step_end_turn()
+            destroyed = any(b.hp <= 0 for b in env.bases.values())
+            return _result(env, w, "base_destroyed" if destroyed else "target_bank", checksums)
 
-        w = env.winner()
-        if w is not None:
-            return EpisodeResult(
-                winner=w,
-                turns=env.turn,
-                red_bank=env.bank["Red"],
-                blue_bank=env.bank["Blue"],
-                ended_by="target_bank",
-            )
+        if checkpoint_path is not None and clock.due():
+            extra = dict(checkpoint_extra or {})
+            extra["checksums"] = checksums
+            checkpoint.save(checkpoint_path, env, (red_agent, blue_agent), extra)
+            clock.saved()
 
     # If we hit max turns, call it by bank or draw
     winner = None
@@ -59,55 +102,101 @@ def run_episode(env: AgeGridEnv, red_agent, blue_agent) -> EpisodeResult:
     elif env.bank["Blue"] > env.bank["Red"]:
         winner = "Blue"
 
-    return EpisodeResult(
-        winner=winner,
-        turns=env.turn,
-        red_bank=env.bank["Red"],
-        blue_bank=env.bank["Blue"],
-        ended_by="max_turns",
+    return _result(env, winner, "max_turns", checksums)
+
+
+def resume_episode(checkpoint_path: str | Path, red_agent, blue_agent, **kwargs) -> EpisodeResult:
+    """Continue an episode from a run_episode checkpoint. Agents should match the ones that wrote it."""
+    env, agent_states, extra = checkpoint.load(checkpoint_path)
+    checkpoint.restore_agent(red_agent, agent_states[0])
+    checkpoint.restore_agent(blue_agent, agent_states[1])
+    return run_episode(
+        env, red_agent, blue_agent, checkpoint_path=checkpoint_path, checksums=extra["checksums"], **kwargs
     )
 
 
-def main() -> None:
-    episodes = 50
+def _baseline_agents(episode: int) -> tuple:
+    return GreedyAgent(desired_workers=2), RandomAgent(seed=episode)
 
-    red_wins = 0
-    blue_wins = 0
-    draws = 0
 
-    ended_target = 0
-    ended_max = 0
+def _tally(tallies: Dict[str, int], result: EpisodeResult) -> None:
+    tallies["total_turns"] += result.turns
 
-    total_turns = 0
+    if result.ended_by == "target_bank":
+        tallies["ended_target"] += 1
+    elif result.ended_by == "base_destroyed":
+        tallies["ended_base"] += 1
+    else:
+        tallies["ended_max"] += 1
 
-    for i in range(episodes):
-        env = AgeGridEnv()
+    if result.winner == "Red":
+        tallies["red_wins"] += 1
+    elif result.winner == "Blue":
+        tallies["blue_wins"] += 1
+    else:
+        tallies["draws"] += 1
 
-        # Baseline comparison
-        red = GreedyAgent(desired_workers=2)
-        blue = RandomAgent(seed=i)
 
-        result = run_episode(env, red, blue)
-        total_turns += result.turns
+def run_batch(
+    episodes: int = 50, checkpoint_path: str | Path | None = None, checkpoint_every: float = 5.0
+) -> Dict[str, int]:
+    """
+    Greedy (Red) vs Random (Blue) baseline over many episodes.
+    With checkpoint_path set, an interrupted batch resumes where it left off: a checkpoint
+    is written at every episode boundary (next episode, updated tallies) and mid-episode
+    at most every checkpoint_every seconds, timed across the whole batch.
+    """
+    tallies = {"red_wins": 0, "blue_wins": 0, "draws": 0, "ended_target": 0, "ended_base": 0, "ended_max": 0, "total_turns": 0}
+    start = 0
+    resume = checkpoint_path is not None and Path(checkpoint_path).exists()
+    if resume:
+        _, _, extra = checkpoint.load(checkpoint_path)
+        tallies = extra["tallies"]
+        start = extra["episode"]
+    clock = CheckpointClock(checkpoint_every)
+
+    for i in range(start, episodes):
+        # Baseline comparison
+        red, blue = _baseline_agents(i)
 
-        if result.ended_by == "target_bank":
-            ended_target += 1
+        extra = {"episode": i, "tallies": tallies}
+        if resume:
+            result = resume_episode(checkpoint_path, red, blue, checkpoint_extra=extra, clock=clock)
+            resume = False
         else:
-            ended_max += 1
+            env = AgeGridEnv()
+            if checkpoint_path is not None and i > start:
+                # Episode boundary: also replaces the finished episode's mid-episode checkpoint
+                checkpoint.save(checkpoint_path, env, (red, blue), {**extra, "checksums": []})
+                clock.saved()
+            result = run_episode(env, red, blue, checkpoint_path=checkpoint_path, checkpoint_extra=extra, clock=clock)
 
-        if result.winner == "Red":
-            red_wins += 1
-        elif result.winner == "Blue":
-            blue_wins += 1
-        else:
-            draws += 1
+        _tally(tallies, result)
+
+    if checkpoint_path is not None and Path(checkpoint_path).exists():
+        os.remove(checkpoint_path)
+
+    return tallies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Greedy vs Random baseline.")
+    parser.add_argument("--episodes", type=int, default=50)
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file; resumes from it if present")
+    args = parser.parse_args()
+
+    episodes = args.episodes
+    t = run_batch(episodes, args.checkpoint)
 
     print(f"Episodes: {episodes}")
     print(f"Win condition: first to target_bank={AgeGridEnv().config.target_bank} (else max_turns)")
-    print(f"Red wins: {red_wins} | Blue wins: {blue_wins} | Draws: {draws}")
-    print(f"Ended by target_bank: {ended_target} | Ended by max_turns: {ended_max}")
-    print(f"Avg turns: {total_turns / episodes:.1f}")
+    print(f"Red wins: {t['red_wins']} | Blue wins: {t['blue_wins']} | Draws: {t['draws']}")
+    print(
+        f"Ended by target_bank: {t['ended_target']} | Ended by base_destroyed: {t['ended_base']} | "
+        f"Ended by max_turns: {t['ended_max']}"
+    )
+    print(f"Avg turns: {t['total_turns'] / episodes:.1f}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from itertools import product
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import hashlib
+import json
+import math
+import random
+from statistics import NormalDist
+
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+from src.agegrid.agents.greedy import GreedyAgent
+from src.agegrid.agents.random import RandomAgent
+from src.agegrid.runner.simulate import run_episode
+
+
+@dataclass
+class SweepResult:
+    params: Dict[str, Any]
+    config_hash: str
+    episodes: int
+    red_wins: int
+    blue_wins: int
+    draws: int
+    avg_turns: float
+    ci_low: float  # Wilson interval on Red's win rate
+    ci_high: float
+
+    @property
+    def red_win_rate(self) -> float:
+        return self.red_wins / self.episodes if self.episodes else 0.0
+
+
+@dataclass(frozen=True)
+class StopRule:
+    """
+    Sequential stopping: episodes run in batches, and after each batch the
+    interval is checked against ci_width. Look k uses level alpha / (k * (k + 1)),
+    so across all looks the chance of stopping on an interval that misses the
+    true win rate stays below alpha.
+    """
+    batch: int = 50
+    min_episodes: int = 100
+    max_episodes: int = 2000
+    ci_width: float = 0.05
+    alpha: float = 0.05
+
+    def z(self, look: int) -> float:
+        """Two-sided critical value for the look-th interval check (1-based)."""
+        return NormalDist().inv_cdf(1 - self.alpha / (look * (look + 1)) / 2)
+
+
+def default_matchup(episode: int) -> tuple:
+    """Same baseline pairing as simulate.main: Greedy (Red) vs Random (Blue)."""
+    return GreedyAgent(desired_workers=2), RandomAgent(seed=episode)
+
+
+# Search spaces
+
+def grid_space(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the given GameConfig overrides."""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in product(*(grid[n] for n in names))]
+
+
+def random_space(space: Dict[str, Any], n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    n random samples. Each entry in `space` is either a list of choices
+    or an inclusive (low, high) int range.
+    """
+    rng = random.Random(seed)
+    samples: List[Dict[str, Any]] = []
+    for _ in range(n):
+        params: Dict[str, Any] = {}
+        for name in sorted(space):
+            spec = space[name]
+            if isinstance(spec, tuple):
+                params[name] = rng.randint(spec[0], spec[1])
+            else:
+                params[name] = rng.choice(list(spec))
+        samples.append(params)
+    return samples
+
+
+# Stats
+
+def wilson_interval(wins: int, n: int, z: float = 1.96) -> tuple[float, float]:
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def config_hash(config: GameConfig, matchup: Callable[[int], tuple], stop: StopRule | None = None) -> str:
+    """Cache key: results depend on the stopping rule as well as the config and matchup."""
+    payload = json.dumps(
+        {
+            "config": asdict(config),
+            "matchup": f"{matchup.__module__}.{matchup.__qualname__}",
+            "stop": asdict(stop or StopRule()),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+# Evaluating one config
+
+def evaluate_config(
+    params: Dict[str, Any],
+    base: GameConfig | None = None,
+    matchup: Callable[[int], tuple] = default_matchup,
+    stop: StopRule | None = None,
+) -> SweepResult:
+    """
+    Run episodes in batches until the Red win-rate interval is narrower than
+    stop.ci_width (after at least stop.min_episodes), or stop.max_episodes is reached.
+    The reported interval is the last one checked, at that look's corrected level.
+    Episode i uses map seed base.seed + i and matchup(i).
+    """
+    stop = stop or StopRule()
+    config = replace(base or GameConfig(), **params)
+    batch, max_episodes = stop.batch, stop.max_episodes
+
+    red = blue = draws = turns = n = looks = 0
+    low, high = 0.0, 1.0
+    while n < max_episodes:
+        for i in range(n, min(n + batch, max_episodes)):
+            red_agent, blue_agent = matchup(i)
+            result = run_episode(AgeGridEnv(replace(config, seed=config.seed + i)), red_agent, blue_agent)
+            turns += result.turns
+            if result.winner == "Red":
+                red += 1
+            elif result.winner == "Blue":
+                blue += 1
+            else:
+                draws += 1
+        n = min(n + batch, max_episodes)
+
+        looks += 1
+        low, high = wilson_interval(red, n, stop.z(looks))
+        if n >= stop.min_episodes and high - low <= stop.ci_width:
+            break
+
+    return SweepResult(
+        params=params,
+        config_hash=config_hash(config, matchup, stop),
+        episodes=n,
+        red_wins=red,
+        blue_wins=blue,
+        draws=draws,
+        avg_turns=turns / n if n else 0.0,
+        ci_low=low,
+        ci_high=high,
+    )
+
+
+# Sweep
+
+def _load_cache(path: Optional[Path]) -> Dict[str, dict]:
+    if path is None or not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _save_cache(path: Optional[Path], cache: Dict[str, dict]) -> None:
+    if path is None:
+        return
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(cache, indent=1, sort_keys=True))
+    tmp.replace(path)
+
+
+def run_sweep(
+    candidates: List[Dict[str, Any]],
+    base: GameConfig | None = None,
+    matchup: Callable[[int], tuple] = default_matchup,
+    workers: int = 1,
+    cache_path: str | Path | None = None,
+    stop: StopRule | None = None,
+) -> List[SweepResult]:
+    """
+    Evaluate every candidate (dict of GameConfig overrides), in parallel when workers > 1.
+    Results are cached by config hash (config, matchup and stop rule), so rerunning a
+    sweep only pays for new configs or a changed stop rule.
+    """
+    base = base or GameConfig()
+    stop = stop or StopRule()
+    path = Path(cache_path) if cache_path is not None else None
+    cache = _load_cache(path)
+
+    results: Dict[int, SweepResult] = {}
+    todo: List[int] = []
+    for idx, params in enumerate(candidates):
+        cached = cache.get(config_hash(replace(base, **params), matchup, stop))
+        if cached is not None:
+            results[idx] = SweepResult(**cached)
+        else:
+            todo.append(idx)
+
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                idx: pool.submit(evaluate_config, candidates[idx], base, matchup, stop)
+                for idx in todo
+            }
+            for idx, fut in futures.items():
+                results[idx] = fut.result()
+    else:
+        for idx in todo:
+            results[idx] = evaluate_config(candidates[idx], base, matchup, stop)
+
+    for idx in todo:
+        cache[results[idx].config_hash] = asdict(results[idx])
+    if todo:
+        _save_cache(path, cache)
+
+    return [results[idx] for idx in range(len(candidates))]
+
+
+def main() -> None:
+    candidates = grid_space({
+        "worker_spawn_cost": [10, 20, 30],
+        "target_bank": [150, 200, 300],
+    })
+    results = run_sweep(candidates, workers=4, cache_path="sweep_cache.json")
+
+    for r in sorted(results, key=lambda r: abs(r.red_win_rate - 0.5)):
+        print(
+            f"{r.params} | episodes={r.episodes} | Red win rate={r.red_win_rate:.3f} "
+            f"[{r.ci_low:.3f}, {r.ci_high:.3f}] | Avg turns={r.avg_turns:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
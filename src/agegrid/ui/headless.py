@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+import itertools
+import json
+import os
+
+import pygame
+
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+from src.agegrid.agents.greedy import GreedyAgent
+from src.agegrid.agents.random import RandomAgent
+
+# Same palette as the live viewer
+_BG = (22, 22, 22)
+_TILE = (35, 35, 35)
+_TILE_EDGE = (55, 55, 55)
+_RESOURCE = (60, 160, 90)
+_BASE = {"Red": (180, 60, 60), "Blue": (70, 90, 190)}
+_UNIT = {"Red": (240, 210, 120), "Blue": (180, 220, 255)}
+_TURRET = {"Red": (130, 40, 40), "Blue": (40, 60, 130)}
+_TEXT = (240, 240, 240)
+
+
+def _offscreen_sdl() -> None:
+    """
+    Point SDL at the dummy video driver. Only has an effect before pygame initialises,
+    so it is called from FrameRenderer and pool workers rather than at import time
+    (importing this module must not take the window away from e.g. the live viewer).
+    SDL's own SIGTERM handler would otherwise stop pool workers from being terminated.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+
+class FrameRenderer:
+    """
+    Draws env states into one off-screen surface. The grid background and
+    every sprite are rendered once up front and only blitted per frame.
+    """
+
+    def __init__(self, config: GameConfig, tile: int = 16, header: bool = True):
+        if not pygame.get_init():
+            _offscreen_sdl()
+            pygame.init()
+        if pygame.display.get_surface() is None:
+            # A 1x1 dummy display so surfaces can be converted to the fast blit format
+            pygame.display.set_mode((1, 1))
+
+        self.tile = tile
+        self.top = tile * 2 if header else 0
+        self.size = (config.width * tile, config.height * tile + self.top)
+        self.surface = pygame.Surface(self.size).convert()
+        self.font = pygame.font.SysFont(None, tile + 8) if header else None
+
+        self.background = pygame.Surface(self.size).convert()
+        self.background.fill(_BG)
+        for y in range(config.height):
+            for x in range(config.width):
+                rect = pygame.Rect(x * tile, self.top + y * tile, tile, tile)
+                pygame.draw.rect(self.background, _TILE, rect)
+                pygame.draw.rect(self.background, _TILE_EDGE, rect, width=1)
+
+        self.sprites: Dict[Tuple[str, str], pygame.Surface] = {}
+        self.sprites[("resource", "")] = self._sprite(
+            lambda s: pygame.draw.circle(s, _RESOURCE, (tile // 2, tile // 2), tile // 5)
+        )
+        for f in ("Red", "Blue"):
+            self.sprites[("base", f)] = self._sprite(lambda s, f=f: s.fill(_BASE[f]))
+            self.sprites[("worker", f)] = self._sprite(
+                lambda s, f=f: pygame.draw.circle(s, _UNIT[f], (tile // 2, tile // 2), tile // 4)
+            )
+            self.sprites[("soldier", f)] = self._sprite(
+                lambda s, f=f: pygame.draw.rect(s, _UNIT[f], pygame.Rect(tile // 4, tile // 4, tile // 2, tile // 2))
+            )
+            self.sprites[("turret", f)] = self._sprite(
+                lambda s, f=f: pygame.draw.rect(s, _TURRET[f], pygame.Rect(2, 2, tile - 4, tile - 4), width=2)
+            )
+
+    def _sprite(self, draw) -> pygame.Surface:
+        s = pygame.Surface((self.tile, self.tile), pygame.SRCALPHA)
+        draw(s)
+        return s.convert_alpha()
+
+    def draw(self, env: AgeGridEnv) -> pygame.Surface:
+        tile, top = self.tile, self.top
+        blit = self._begin()
+
+        res = self.sprites[("resource", "")]
+        for r in env.resources:
+            if r.remaining > 0:
+                blit(res, (r.position[0] * tile, top + r.position[1] * tile))
+        for faction, base in env.bases.items():
+            blit(self.sprites[("base", faction)], (base.position[0] * tile, top + base.position[1] * tile))
+        for b in env.buildings:
+            blit(self.sprites[(b.building_type, b.faction)], (b.position[0] * tile, top + b.position[1] * tile))
+        for u in env.units:
+            blit(self.sprites[(u.unit_type, u.faction)], (u.position[0] * tile, top + u.position[1] * tile))
+
+        return self._finish(env.turn, env.bank)
+
+    def draw_state(self, state: dict) -> pygame.Surface:
+        """Same as draw, straight from a checkpoint.env_to_state dict (no env is rebuilt)."""
+        tile, top = self.tile, self.top
+        blit = self._begin()
+
+        res = self.sprites[("resource", "")]
+        for _, x, y, remaining in state["resources"]:
+            if remaining > 0:
+                blit(res, (x * tile, top + y * tile))
+        for faction, _, x, y in state["bases"]:
+            blit(self.sprites[("base", faction)], (x * tile, top + y * tile))
+        for _, faction, building_type, _, x, y, _, _ in state["buildings"]:
+            blit(self.sprites[(building_type, faction)], (x * tile, top + y * tile))
+        for _, faction, unit_type, _, x, y, _, _ in state["units"]:
+            blit(self.sprites[(unit_type, faction)], (x * tile, top + y * tile))
+
+        return self._finish(state["turn"], state["bank"])
+
+    def render(self, frame: AgeGridEnv | dict) -> pygame.Surface:
+        """Draw a live env or a recorded state dict."""
+        return self.draw_state(frame) if isinstance(frame, dict) else self.draw(frame)
+
+    def _begin(self):
+        self.surface.blit(self.background, (0, 0))
+        return self.surface.blit
+
+    def _finish(self, turn: int, bank: Dict[str, int]) -> pygame.Surface:
+        if self.font is not None:
+            text = f"Turn {turn}  R {bank['Red']}  B {bank['Blue']}"
+            self.surface.blit(self.font.render(text, True, _TEXT), (4, 2))
+        return self.surface
+
+
+# Frame sources
+
+def simulated_states(env: AgeGridEnv, red_agent, blue_agent) -> Iterator[AgeGridEnv]:
+    """Yields the (same, mutating) env at the start and after every faction phase."""
+    acts = (red_agent.act, blue_agent.act)
+    yield env
+    while env.turn < env.config.max_turns and env.winner() is None:
+        env.step_faction_codes(acts[env.current_player])
+        env.step_end_turn()
+        yield env
+
+
+def save_recording(path: str | Path, states: Iterable[dict]) -> int:
+    """Write checkpoint.env_to_state dicts as JSON lines, one frame per line."""
+    n = 0
+    with open(path, "w") as f:
+        for state in states:
+            f.write(json.dumps(state, separators=(",", ":")))
+            f.write("\n")
+            n += 1
+    return n
+
+
+def load_recording(path: str | Path) -> Iterator[dict]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# Output
+
+def write_png_frames(
+    renderer: FrameRenderer, states: Iterable[AgeGridEnv | dict], out_dir: str | Path, prefix: str = "frame"
+) -> int:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    n = 0
+    for frame in states:
+        pygame.image.save(renderer.render(frame), str(out_dir / f"{prefix}_{n:05d}.png"))
+        n += 1
+    return n
+
+
+def write_rgb_stream(renderer: FrameRenderer, states: Iterable[AgeGridEnv | dict], path: str | Path) -> int:
+    """Raw RGB24 frames back to back, each renderer.size[0] * renderer.size[1] * 3 bytes."""
+    n = 0
+    with open(path, "wb", buffering=1 << 20) as f:
+        for frame in states:
+            f.write(pygame.image.tobytes(renderer.render(frame), "RGB"))
+            n += 1
+    return n
+
+
+# Batch rendering across processes
+
+_renderers: Dict[Tuple[int, int, int], FrameRenderer] = {}
+
+
+def _renderer_for(config: GameConfig, tile: int) -> FrameRenderer:
+    # One renderer (and one set of cached surfaces) per map size per process
+    key = (config.width, config.height, tile)
+    renderer = _renderers.get(key)
+    if renderer is None:
+        renderer = _renderers[key] = FrameRenderer(config, tile)
+    return renderer
+
+
+def _write(renderer: FrameRenderer, frames: Iterable[AgeGridEnv | dict], out_dir: str | Path, name: str, fmt: str) -> Tuple[str, int]:
+    if fmt == "png":
+        target = Path(out_dir) / name
+        return str(target), write_png_frames(renderer, frames, target)
+    if fmt == "rgb":
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        target = Path(out_dir) / f"{name}_{renderer.size[0]}x{renderer.size[1]}.rgb"
+        return str(target), write_rgb_stream(renderer, frames, target)
+    raise ValueError(f"Unknown format {fmt!r} (expected 'png' or 'rgb')")
+
+
+def render_episode(seed: int, out_dir: str | Path, fmt: str = "png", tile: int = 16) -> Tuple[str, int]:
+    """Simulate Greedy (Red) vs Random (Blue) on map `seed` and render every phase."""
+    env = AgeGridEnv(GameConfig(seed=seed))
+    renderer = _renderer_for(env.config, tile)
+    states = simulated_states(env, GreedyAgent(desired_workers=2), RandomAgent(seed=seed))
+    return _write(renderer, states, out_dir, f"episode_{seed:05d}", fmt)
+
+
+def render_recording(
+    recording: str | Path | List[dict], out_dir: str | Path, name: str | None = None, fmt: str = "png", tile: int = 16
+) -> Tuple[str, int]:
+    """
+    Render a recorded game: a list of checkpoint.env_to_state dicts or a save_recording file.
+    Output is named after the file unless `name` is given.
+    """
+    if isinstance(recording, (str, Path)):
+        name = name or Path(recording).stem
+        states = load_recording(recording)
+    else:
+        states = iter(recording)
+    if name is None:
+        raise ValueError("name is required when rendering an in-memory recording")
+
+    first = next(states, None)
+    if first is None:
+        return str(Path(out_dir) / name), 0
+    renderer = _renderer_for(GameConfig(**first["config"]), tile)
+    return _write(renderer, itertools.chain((first,), states), out_dir, name, fmt)
+
+
+def _render_job(args: Tuple[int, str, str, int]) -> Tuple[str, int]:
+    return render_episode(*args)
+
+
+def _render_recording_job(args: Tuple[str | List[dict], str, str | None, str, int]) -> Tuple[str, int]:
+    return render_recording(*args)
+
+
+def _pool_map(job, jobs: list, workers: int | None) -> list:
+    chunksize = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+    with Pool(processes=workers, initializer=_offscreen_sdl) as pool:
+        results = pool.map(job, jobs, chunksize=chunksize)
+        pool.close()
+        pool.join()
+    return results
+
+
+def render_episodes(
+    seeds: Iterable[int], out_dir: str | Path, fmt: str = "png", tile: int = 16, workers: int | None = None
+) -> List[Tuple[str, int]]:
+    """Render many episodes in parallel. Returns (output path, frame count) per seed."""
+    jobs = [(seed, str(out_dir), fmt, tile) for seed in seeds]
+    return _pool_map(_render_job, jobs, workers)
+
+
+def render_recordings(
+    recordings: Iterable[str | Path | List[dict]],
+    out_dir: str | Path,
+    fmt: str = "png",
+    tile: int = 16,
+    workers: int | None = None,
+) -> List[Tuple[str, int]]:
+    """
+    Render many recorded games in parallel. Each is a save_recording file (sent to the
+    worker by path) or a list of env_to_state dicts (named recording_00000, ... by position).
+    Returns (output path, frame count) per recording.
+    """
+    jobs = []
+    for i, rec in enumerate(recordings):
+        if isinstance(rec, (str, Path)):
+            jobs.append((str(rec), str(out_dir), None, fmt, tile))
+        else:
+            jobs.append((rec, str(out_dir), f"recording_{i:05d}", fmt, tile))
+    return _pool_map(_render_recording_job, jobs, workers)
+
+
+def main() -> None:
+    results = render_episodes(range(20), "renders", fmt="png")
+    print(f"Rendered {sum(n for _, n in results)} frames for {len(results)} episodes into renders/")
+
+
+if __name__ == "__main__":
+    main()
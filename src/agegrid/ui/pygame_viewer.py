@@ -2,6 +2,7 @@ from __future__ import annotations
 import pygame
 
 from src.agegrid.env.agegrid_env import AgeGridEnv
+from src.agegrid.env import checkpoint
 from src.agegrid.agents.greedy import GreedyAgent
 
 
@@ -15,6 +16,10 @@ def _step_full_turn(env: AgeGridEnv, red_agent, blue_agent) -> tuple[list[str],
     return red_log, blue_log
 
 
+# S saves the current game here, L loads it back
+CHECKPOINT_PATH = "agegrid_viewer.ckpt"
+
+
 def run_viewer() -> None:
     env = AgeGridEnv()
 
@@ -55,6 +60,17 @@ def run_viewer() -> None:
             if event.type == pygame.KEYDOWN:
                 if event.key in (pygame.K_SPACE, pygame.K_RETURN):
                     last_red, last_blue = _step_full_turn(env, red_agent, blue_agent)
+                elif event.key == pygame.K_s:
+                    checkpoint.save(CHECKPOINT_PATH, env, (red_agent, blue_agent))
+                elif event.key == pygame.K_l:
+                    try:
+                        env, agent_states, _ = checkpoint.load(CHECKPOINT_PATH)
+                    except (OSError, ValueError):
+                        pass
+                    else:
+                        checkpoint.restore_agent(red_agent, agent_states[0])
+                        checkpoint.restore_agent(blue_agent, agent_states[1])
+                        last_red, last_blue = [], []
 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 if btn_rect.collidepoint(event.pos):
@@ -133,13 +149,23 @@ def run_viewer() -> None:
             color = (180, 60, 60) if faction == "Red" else (70, 90, 190)
             pygame.draw.rect(screen, color, rect)
 
-        # Draw units (workers)
+        # Draw turrets
+        for b in env.buildings:
+            x, y = b.position
+            rect = pygame.Rect(ox + x * tile + 8, oy + y * tile + 8, tile - 16, tile - 16)
+            color = (130, 40, 40) if b.faction == "Red" else (40, 60, 130)
+            pygame.draw.rect(screen, color, rect, width=3)
+
+        # Draw units (workers as circles, soldiers as squares)
         for u in env.units:
             x, y = u.position
             cx = ox + x * tile + tile // 2
             cy = oy + y * tile + tile // 2
             color = (240, 210, 120) if u.faction == "Red" else (180, 220, 255)
-            pygame.draw.circle(screen, color, (cx, cy), 12)
+            if u.unit_type == "soldier":
+                pygame.draw.rect(screen, color, pygame.Rect(cx - 11, cy - 11, 22, 22))
+            else:
+                pygame.draw.circle(screen, color, (cx, cy), 12)
 
         pygame.display.flip()
 
@@ -0,0 +1,92 @@
+import pytest
+
+from src.agegrid.env.actions import Reason, decode_action, encode_action, pack, ActionKind
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+
+
+WIDTH = HEIGHT = 12
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        ("gather", 3),
+        ("spawn_worker",),
+        ("move_towards", 7, (0, 0)),
+        ("move_towards", 7, (11, 11)),
+        ("attack", 65535),
+        ("spawn_soldier",),
+        ("build_turret",),
+    ],
+)
+def test_encode_decode_round_trip(action):
+    assert decode_action(encode_action(action, WIDTH, HEIGHT), WIDTH) == action
+
+
+@pytest.mark.parametrize(
+    "action",
+    [(), ("teleport", 1), ("gather",), ("gather", 70000), ("move_towards", 1, (12, 0)), ("move_towards", 1, (0, -1)), ("move_towards", 1, (3, 50))],
+)
+def test_encode_rejects_bad_actions(action):
+    with pytest.raises(ValueError):
+        encode_action(action, WIDTH, HEIGHT)
+
+
+def test_decode_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        decode_action(pack(15), WIDTH)
+
+
+def test_encoded_target_off_the_map_is_bad_args():
+    env = AgeGridEnv(GameConfig())
+    env.start_faction_turn()
+    worker = env.units[0]
+    cells = env.config.width * env.config.height
+    assert env._apply(pack(ActionKind.MOVE_TOWARDS, worker.id, cells)) == Reason.BAD_ARGS
+    assert env.apply_action(pack(ActionKind.MOVE_TOWARDS, worker.id, cells - 1)) == (True, "move")
+
+
+def test_negative_codes_are_rejected():
+    env = AgeGridEnv(GameConfig())
+    env.start_faction_turn()
+    worker = env.units[0]
+    assert env._apply(pack(ActionKind.MOVE_TOWARDS, worker.id, -1)) == Reason.BAD_ACTION
+    assert env.apply_action(-1) == (False, "bad_action")
+    assert worker.position == (2, 1)
+    assert env.attempts_left == env.config.max_attempts_per_turn - 2
+
+
+@pytest.mark.parametrize("target", [(3, 50), (12, 0), (-1, 0), (0, -1), (3,), "a"])
+def test_off_map_targets_fail_in_both_forms(target):
+    env = AgeGridEnv(GameConfig())
+    env.start_faction_turn()
+    worker = env.units[0]
+    assert env.apply_action(("move_towards", worker.id, target)) == (False, "bad_args")
+    with pytest.raises(ValueError):
+        encode_action(("move_towards", worker.id, target), env.config.width, env.config.height)
+
+
+def test_tuple_and_encoded_actions_agree():
+    a, b = AgeGridEnv(GameConfig()), AgeGridEnv(GameConfig())
+    a.start_faction_turn()
+    b.start_faction_turn()
+    worker = a.units[0]
+    for action in [("gather", worker.id), ("move_towards", worker.id, (5, 5)), ("spawn_worker",), ("attack", worker.id)]:
+        assert a.apply_action(action) == b.apply_action(encode_action(action, a.config.width, a.config.height))
+    assert a.state_hash == b.state_hash
+
+
+def test_numpy_integer_actions_are_accepted():
+    np = pytest.importorskip("numpy")
+    env = AgeGridEnv(GameConfig())
+    env.start_faction_turn()
+    worker = env.units[0]
+    code = np.int64(encode_action(("move_towards", worker.id, (5, 5)), env.config.width, env.config.height))
+    assert env.apply_action(code) == (True, "move")
+    assert env.apply_action(np.uint16(encode_action(("spawn_worker",), env.config.width, env.config.height))) == (True, "spawn_worker")
+
+
+def test_bools_are_not_actions():
+    env = AgeGridEnv(GameConfig())
+    env.start_faction_turn()
+    assert env.apply_action(True) == (False, "bad_action")
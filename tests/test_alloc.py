@@ -0,0 +1,31 @@
+from src.agegrid.agents.greedy import GreedyAgent
+from src.agegrid.agents.random import RandomAgent
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+from src.agegrid.runner.alloc_profile import profile_episode
+
+# Lazily built caches (sight edges, spatial buckets) make the first use of a
+# shape cost a few KiB; steady-state decide + apply is a few hundred bytes.
+MAX_ACTION_BYTES = 8 * 1024
+AVG_ACTION_BYTES = 1024
+
+
+def test_per_action_allocation_budget():
+    for seed in range(3):
+        report = profile_episode(AgeGridEnv(GameConfig(seed=seed)), GreedyAgent(desired_workers=2), RandomAgent(seed=seed))
+        assert report.actions > 0
+        assert report.max_action_bytes <= MAX_ACTION_BYTES
+        assert report.avg_action_bytes <= AVG_ACTION_BYTES
+        assert report.total_action_bytes >= report.max_action_bytes
+
+
+def test_one_sample_per_applied_action():
+    codes = []
+    env = AgeGridEnv()
+    report = profile_episode(env, GreedyAgent(desired_workers=2), RandomAgent(seed=0))
+
+    replay = AgeGridEnv()
+    acts = (GreedyAgent(desired_workers=2).act, RandomAgent(seed=0).act)
+    while replay.turn < replay.config.max_turns and replay.winner() is None:
+        replay.step_faction_codes(acts[replay.current_player], codes.append)
+        replay.step_end_turn()
+    assert report.actions == len(codes)
@@ -0,0 +1,75 @@
+from src.agegrid.env import checkpoint, zobrist
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+
+
+def _env() -> AgeGridEnv:
+    env = AgeGridEnv(GameConfig(starting_resources=100, target_bank=10_000))
+    env.start_faction_turn()
+    return env
+
+
+def test_build_turret_next_to_base():
+    env = _env()
+    assert env.apply_action(("build_turret",)) == (True, "build_turret")
+
+    (turret,) = env.buildings
+    assert turret.faction == "Red" and turret.building_type == "turret"
+    assert turret.position == (0, 1)  # (2, 1) is taken by Red's starting worker
+    assert env._is_occupied(turret.position)
+    assert env.bank["Red"] == 100 - env.config.turret_cost
+    assert env.state_hash == zobrist.full_hash(env)
+
+
+def test_turret_limit_and_cost():
+    env = _env()
+    env.config.max_turrets = 1
+    assert env.apply_action(("build_turret",)) == (True, "build_turret")
+    assert env.apply_action(("build_turret",)) == (False, "build_turret_failed")
+
+    poor = AgeGridEnv(GameConfig(starting_resources=10))
+    poor.start_faction_turn()
+    assert poor.apply_action(("build_turret",)) == (False, "build_turret_failed")
+
+
+def test_turret_fires_at_end_of_phase():
+    env = _env()
+    env.apply_action(("build_turret",))
+    env._spawn_soldier("Blue", (0, 3))
+    soldier = env.units[-1]
+
+    env.step_end_turn()
+    assert soldier.hp == env.config.soldier_hp - env.config.turret_attack_damage
+    assert env.state_hash == zobrist.full_hash(env)
+
+
+def test_soldier_destroys_turret():
+    env = _env()
+    env.apply_action(("build_turret",))
+    turret = env.buildings[0]
+    env._spawn_soldier("Blue", (0, 2))
+    soldier = env.units[-1]
+    env.step_end_turn()  # Red's turret shoots first
+    env.start_faction_turn()
+
+    hits = 0
+    while env.buildings:
+        assert env.apply_action(("attack", soldier.id)) == (True, "attack")
+        hits += 1
+        assert env.state_hash == zobrist.full_hash(env)
+        if env.actions_left == 0:
+            env.start_faction_turn()
+
+    assert hits == -(-env.config.turret_hp // env.config.soldier_attack_damage)
+    assert not env._is_occupied(turret.position)
+    assert env.bases["Red"].hp == env.config.base_hp
+
+
+def test_checkpoint_keeps_turrets():
+    env = _env()
+    env.apply_action(("build_turret",))
+    restored = checkpoint.loads(checkpoint.dumps(env))[0]
+
+    assert restored.buildings == env.buildings
+    assert restored._is_occupied(env.buildings[0].position)
+    assert restored._next_building_id == env._next_building_id
+    assert restored.state_hash == env.state_hash
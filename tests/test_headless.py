@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from src.agegrid.agents.greedy import GreedyAgent
+from src.agegrid.agents.random import RandomAgent
+from src.agegrid.env import checkpoint
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+from src.agegrid.ui.headless import (
+    FrameRenderer,
+    render_recordings,
+    save_recording,
+    simulated_states,
+    write_rgb_stream,
+)
+
+
+def test_recorded_states_render_like_live_envs(tmp_path):
+    env = AgeGridEnv(GameConfig(seed=1, max_turns=10))
+    renderer = FrameRenderer(env.config, tile=8, header=False)
+    env._build_turret("Blue", (env.config.width - 1, env.config.height - 2))
+
+    live, recorded = [], []
+    for frame in simulated_states(env, GreedyAgent(desired_workers=2), RandomAgent(seed=1)):
+        live.append(pygame.image.tobytes(renderer.draw(frame), "RGB"))
+        recorded.append(checkpoint.env_to_state(frame))
+
+    assert [pygame.image.tobytes(renderer.render(state), "RGB") for state in recorded] == live
+
+    out = tmp_path / "frames.rgb"
+    assert write_rgb_stream(renderer, recorded, out) == len(live)
+    assert out.read_bytes() == b"".join(live)
+
+
+def test_import_leaves_sdl_environment_alone():
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SDL_")}
+    code = "import os, src.agegrid.ui.headless; print(sorted(k for k in os.environ if k.startswith('SDL_')))"
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_recordings_render_in_parallel(tmp_path):
+    recordings, expected = [], []
+    for seed in range(3):
+        env = AgeGridEnv(GameConfig(seed=seed, max_turns=6))
+        renderer = FrameRenderer(env.config, tile=8)
+        states, frames = [], []
+        for frame in simulated_states(env, GreedyAgent(desired_workers=2), RandomAgent(seed=seed)):
+            frames.append(pygame.image.tobytes(renderer.draw(frame), "RGB"))
+            states.append(checkpoint.env_to_state(frame))
+        recordings.append(states)
+        expected.append(b"".join(frames))
+
+    # Two from files, one in memory
+    paths = [tmp_path / f"game{i}.jsonl" for i in range(2)]
+    for path, states in zip(paths, recordings):
+        assert save_recording(path, states) == len(states)
+    sources = [*paths, recordings[2]]
+
+    results = render_recordings(sources, tmp_path / "out", fmt="rgb", tile=8, workers=2)
+
+    assert [Path(p).name.split("_")[0] for p, _ in results] == ["game0", "game1", "recording"]
+    assert [n for _, n in results] == [len(states) for states in recordings]
+    assert [Path(p).read_bytes() for p, _ in results] == expected
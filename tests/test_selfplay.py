@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.agegrid.env.agegrid_env import GameConfig
+from src.agegrid.runner.selfplay import SelfPlayPipeline
+
+
+def _broken_matchup(actor_id: int, episode: int) -> tuple:
+    raise ValueError("bad matchup")
+
+
+def test_pipeline_drains_every_episode():
+    config = GameConfig(max_turns=5)
+    with SelfPlayPipeline(num_actors=2, episodes_per_actor=2, capacity=64, config=config) as pipeline:
+        transitions = terminal = 0
+        for batch in pipeline.batches(16):
+            transitions += len(batch)
+            terminal += int(batch.done.sum())
+    assert transitions > 0
+    # one terminal transition per side per episode
+    assert terminal == 2 * 2 * 2
+
+
+def test_crashed_actor_is_reported():
+    with SelfPlayPipeline(num_actors=1, episodes_per_actor=1, capacity=64, matchup=_broken_matchup) as pipeline:
+        with pytest.raises(RuntimeError, match="exited with code 1"):
+            for _ in pipeline.batches(16):
+                pass
+
+
+def test_per_side_trajectories_end_in_opposite_rewards():
+    # Greedy (Red) always out-earns Random (Blue) here, so no episode is drawn
+    config = GameConfig(max_turns=20)
+    players, rewards, dones = [], [], []
+    with SelfPlayPipeline(num_actors=1, episodes_per_actor=3, capacity=32, config=config) as pipeline:
+        for batch in pipeline.batches(8):
+            players.append(batch.player.copy())
+            rewards.append(batch.reward.copy())
+            dones.append(batch.done.copy())
+    players, rewards, dones = np.concatenate(players), np.concatenate(rewards), np.concatenate(dones)
+    assert set(players.tolist()) == {0, 1}
+
+    # Rebuild each side's own trajectory: its terminal rewards, episode by episode
+    terminal = {}
+    for p in (0, 1):
+        mine = players == p
+        side_done, side_reward = dones[mine], rewards[mine]
+        assert side_done[-1] == 1
+        assert np.all(side_reward[side_done == 0] == 0)
+        terminal[p] = side_reward[side_done == 1]
+
+    assert len(terminal[0]) == len(terminal[1]) == 3
+    assert set(np.abs(terminal[0]).tolist()) == {1.0}
+    assert np.all(terminal[0] == -terminal[1])
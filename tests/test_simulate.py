@@ -0,0 +1,50 @@
+import pytest
+
+from src.agegrid.env import checkpoint
+from src.agegrid.runner import simulate
+
+
+class Preempted(Exception):
+    pass
+
+
+def _count_saves(monkeypatch, stop_after: int | None = None) -> list:
+    saves = []
+    real_save = checkpoint.save
+
+    def save(path, env, agents=(), extra=None):
+        real_save(path, env, agents, extra)
+        saves.append(dict(extra))
+        if stop_after is not None and len(saves) == stop_after:
+            raise Preempted
+
+    monkeypatch.setattr(simulate.checkpoint, "save", save)
+    return saves
+
+
+def test_short_episodes_still_checkpoint_the_batch(tmp_path, monkeypatch):
+    saves = _count_saves(monkeypatch)
+    simulate.run_batch(10, tmp_path / "batch.ckpt")
+    # One per episode boundary, even though each episode is far shorter than checkpoint_every
+    assert [s["episode"] for s in saves] == list(range(1, 10))
+    assert not (tmp_path / "batch.ckpt").exists()
+
+
+@pytest.mark.parametrize("stop_after", [3, 41, 60, 119])
+def test_interrupted_batch_resumes_to_the_same_tallies(tmp_path, monkeypatch, stop_after):
+    expected = simulate.run_batch(6)
+    path = tmp_path / "batch.ckpt"
+
+    saves = _count_saves(monkeypatch, stop_after)
+    with pytest.raises(Preempted):
+        simulate.run_batch(6, path, checkpoint_every=0.0)
+
+    _, _, extra = checkpoint.load(path)
+    tallies = extra["tallies"]
+    # The file never points back at an episode that already finished
+    assert tallies["red_wins"] + tallies["blue_wins"] + tallies["draws"] == extra["episode"]
+    assert extra == saves[-1]
+
+    monkeypatch.undo()
+    assert simulate.run_batch(6, path) == expected
+    assert not path.exists()
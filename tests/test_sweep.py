@@ -0,0 +1,34 @@
+from src.agegrid.env.agegrid_env import GameConfig
+from src.agegrid.runner import sweep
+from src.agegrid.runner.sweep import StopRule
+
+
+def test_cache_key_includes_stop_rule():
+    config = GameConfig()
+    assert sweep.config_hash(config, sweep.default_matchup) == sweep.config_hash(config, sweep.default_matchup, StopRule())
+    assert sweep.config_hash(config, sweep.default_matchup, StopRule(ci_width=0.1)) != sweep.config_hash(
+        config, sweep.default_matchup, StopRule()
+    )
+
+
+def test_repeated_looks_widen_the_interval():
+    stop = StopRule()
+    assert stop.z(1) > 1.96
+    assert stop.z(1) < stop.z(2) < stop.z(10)
+    # Total level spent over any number of looks stays below alpha
+    assert sum(stop.alpha / (k * (k + 1)) for k in range(1, 10_000)) < stop.alpha
+
+
+def test_run_sweep_reuses_cache_only_for_the_same_stop_rule(tmp_path):
+    cache = tmp_path / "cache.json"
+    base = GameConfig(max_turns=5)
+    quick = StopRule(batch=2, min_episodes=2, max_episodes=2, ci_width=1.0)
+    longer = StopRule(batch=2, min_episodes=4, max_episodes=4, ci_width=1.0)
+
+    first = sweep.run_sweep([{"target_bank": 40}], base, cache_path=cache, stop=quick)
+    again = sweep.run_sweep([{"target_bank": 40}], base, cache_path=cache, stop=quick)
+    more = sweep.run_sweep([{"target_bank": 40}], base, cache_path=cache, stop=longer)
+
+    assert first == again
+    assert first[0].episodes == 2
+    assert more[0].episodes == 4
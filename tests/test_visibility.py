@@ -0,0 +1,40 @@
+from src.agegrid.agents.greedy import GreedyAgent
+from src.agegrid.agents.random import RandomAgent
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+from src.agegrid.env.systems import combat, visibility
+
+
+def _assert_matches_rebuild(env: AgeGridEnv) -> None:
+    incremental = env._visibility
+    visibility.rebuild(env)
+    fresh = env._visibility
+    env._visibility = incremental
+    for f in env.factions:
+        assert incremental.visible[f] == fresh.visible[f]
+        assert incremental.mask[f] == bytearray(1 if c > 0 else 0 for c in fresh.visible[f])
+        assert env.observe(f).visible == bytes(fresh.mask[f])
+
+
+def test_incremental_fog_matches_rebuild_after_play():
+    env = AgeGridEnv(GameConfig(seed=3))
+    acts = (GreedyAgent(desired_workers=2).act, RandomAgent(seed=3).act)
+    while env.turn < env.config.max_turns and env.winner() is None:
+        env.step_faction_codes(acts[env.current_player])
+        env.step_end_turn()
+        _assert_matches_rebuild(env)
+
+
+def test_destroyed_base_loses_sight():
+    env = AgeGridEnv(GameConfig())
+    base = env.bases["Red"]
+    only_base_sees = (1, 5)  # 4 from the base, 5 from Red's worker at (2, 1)
+    assert env._visibility.is_visible("Red", only_base_sees)
+
+    combat.damage_base(env, base, base.hp)
+    assert not env._visibility.is_visible("Red", only_base_sees)
+    assert env._visibility.is_explored("Red", only_base_sees)
+    _assert_matches_rebuild(env)
+
+    # Hitting the ruin again must not remove its sight twice
+    combat.damage_base(env, base, 1)
+    _assert_matches_rebuild(env)
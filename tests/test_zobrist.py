@@ -0,0 +1,86 @@
+import random
+
+from src.agegrid.agents.transposition import TranspositionTable
+from src.agegrid.env import zobrist
+from src.agegrid.env.agegrid_env import AgeGridEnv, GameConfig
+
+
+class SkirmishAgent:
+    """Random mix of economy, movement and combat so every hashed feature changes."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def act(self, env: AgeGridEnv):
+        faction = env.factions[env.current_player]
+        enemy = env.bases[env.factions[1 - env.current_player]]
+        own = [u for u in env.units if u.faction == faction]
+        r = self.rng.random()
+        if r < 0.15 or not own:
+            return (self.rng.choice(("spawn_worker", "spawn_soldier", "build_turret")),)
+        u = self.rng.choice(own)
+        if r < 0.35:
+            return ("gather", u.id)
+        if r < 0.6:
+            return ("attack", u.id)
+        if r < 0.9:
+            return ("move_towards", u.id, enemy.position)
+        return ("move_towards", u.id, (self.rng.randrange(env.config.width), self.rng.randrange(env.config.height)))
+
+
+def _play(env: AgeGridEnv, red, blue) -> None:
+    acts = (red.act, blue.act)
+    while env.turn < env.config.max_turns and env.winner() is None:
+        env.step_faction_codes(acts[env.current_player])
+        assert env.state_hash == zobrist.full_hash(env)
+        env.step_end_turn()
+        assert env.state_hash == zobrist.full_hash(env)
+
+
+def test_incremental_hash_matches_full_hash_after_random_play():
+    combat_seen = False
+    for seed in range(6):
+        config = GameConfig(width=8, height=8, seed=seed, starting_resources=200, target_bank=10_000, max_turns=60)
+        env = AgeGridEnv(config)
+        _play(env, SkirmishAgent(seed), SkirmishAgent(seed + 100))
+        soldiers = env._next_unit_id > 1 + len(env.units)
+        damaged = any(b.hp < config.base_hp for b in env.bases.values())
+        combat_seen = combat_seen or soldiers or damaged
+    assert combat_seen
+
+
+def test_keys_are_deterministic_and_distinct():
+    assert zobrist.unit_key(3, "Red", "worker", (1, 2)) == zobrist.unit_key(3, "Red", "worker", (1, 2))
+    keys = {
+        zobrist.unit_key(3, "Red", "worker", (1, 2)),
+        zobrist.unit_key(3, "Blue", "worker", (1, 2)),
+        zobrist.unit_key(3, "Red", "soldier", (1, 2)),
+        zobrist.unit_key(3, "Red", "worker", (2, 1)),
+        zobrist.unit_key(4, "Red", "worker", (1, 2)),
+        zobrist.unit_hp_key(3, 5),
+        zobrist.base_hp_key("Red", 5),
+        zobrist.bank_key("Red", 5),
+        zobrist.turn_key(5),
+        zobrist.counters_key(3, 10),
+        zobrist.counters_key(10, 3),
+    }
+    assert len(keys) == 11
+
+
+def test_transposition_table_evicts_least_recently_used():
+    tt = TranspositionTable(capacity=2)
+    tt.put(1, "a")
+    tt.put(2, "b")
+    assert tt.get(1) == "a"  # 1 is now the most recently used
+    tt.put(3, "c")
+    assert 2 not in tt
+    assert 1 in tt and 3 in tt
+    assert len(tt) == 2
+
+    assert tt.get(2) is None
+    assert (tt.hits, tt.misses) == (1, 1)
+
+    tt.put(1, "a2")  # overwriting refreshes recency
+    tt.put(4, "d")
+    assert 3 not in tt
+    assert tt.get(1) == "a2"